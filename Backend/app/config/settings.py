@@ -87,6 +87,8 @@ class Settings:
     PRIORITY_AI_EXTERNAL_DATASET = os.getenv("PRIORITY_AI_EXTERNAL_DATASET", "")
     PRIORITY_AI_OFFLINE_MODE = _env_bool("PRIORITY_AI_OFFLINE_MODE", False)
     PRIORITY_AI_REQUEST_TIMEOUT_SECONDS = _env_int("PRIORITY_AI_REQUEST_TIMEOUT_SECONDS", 10)
+    AI_QUANTIZE_INT8 = _env_bool("AI_QUANTIZE_INT8", True)
+    PRIORITY_AI_SHORT_CIRCUIT_CONFIDENCE = _env_float("PRIORITY_AI_SHORT_CIRCUIT_CONFIDENCE", 0.8)
     PROGRESS_AI_ENABLED = _env_bool("PROGRESS_AI_ENABLED", True)
     PROGRESS_AI_MODEL = os.getenv("PROGRESS_AI_MODEL", "typeform/distilbert-base-uncased-mnli")
     PROGRESS_AI_OFFLINE_MODE = _env_bool("PROGRESS_AI_OFFLINE_MODE", False)
@@ -1,4 +1,5 @@
 import atexit
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
 from app.config.settings import settings
 client = MongoClient(settings.MONGO_URL)
@@ -12,6 +13,12 @@ otp_challenges = db["otp_challenges"]
 incident_logs = db["incident_logs"]
 issues_collection = incidents
 atexit.register(client.close)
+async_client = AsyncIOMotorClient(settings.MONGO_URL)
+async_db = async_client[settings.DB_NAME]
+async_users = async_db["users"]
+async_incidents = async_db["incidents"]
+async_tickets = async_db["tickets"]
+atexit.register(async_client.close)
 def init_db():
     from pymongo.errors import OperationFailure
     try:
@@ -26,6 +33,9 @@ def init_db():
         users.create_index("userType")
         users.create_index("officialRole")
         users.create_index([("userType", 1), ("officialRole", 1)])
+        users.create_index([("userType", 1), ("officialRole", 1), ("createdByDepartmentId", 1)])
+        users.create_index([("userType", 1), ("officialRole", 1), ("department", 1), ("createdAt", -1)])
+        users.create_index([("userType", 1), ("officialRole", 1), ("name", 1)])
     except OperationFailure:
         pass
     try:
@@ -47,6 +57,8 @@ def init_db():
         tickets.create_index("assignedTo")
         tickets.create_index("incidentId")
         tickets.create_index("ticketId", unique=True, sparse=True)
+        tickets.create_index([("status", 1), ("priority", 1), ("category", 1), ("createdAt", -1)])
+        tickets.create_index([("status", 1), ("updatedAt", -1)])
     except OperationFailure:
         pass
     try:
@@ -62,11 +74,21 @@ def init_db():
     try:
         otp_challenges.create_index("expiresAt", expireAfterSeconds=0)
         otp_challenges.create_index([("userId", 1), ("purpose", 1), ("used", 1)])
+        otp_challenges.create_index([("userId", 1), ("purpose", 1), ("used", 1), ("createdAt", -1)])
+    except OperationFailure:
+        pass
+    try:
+        # Kept in its own block: databases seeded before the one-doc-per-
+        # (userId, purpose) OTP model still hold duplicate challenge docs
+        # until TTL expiry, and that expected failure must not suppress the
+        # index builds above.
+        otp_challenges.create_index([("userId", 1), ("purpose", 1)], unique=True, sparse=True)
     except OperationFailure:
         pass
     try:
         incident_logs.create_index("ticketId")
         incident_logs.create_index("incidentId")
         incident_logs.create_index("createdAt")
+        incident_logs.create_index([("ticketId", 1), ("createdAt", -1)])
     except OperationFailure:
         pass
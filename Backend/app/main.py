@@ -1,8 +1,10 @@
 import os
 import logging
 import threading
+import orjson
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from app.routes_auth import router as auth_router
 from app.routes_incidents import router as incident_router
@@ -17,7 +19,10 @@ from app.services.priority_ai import warmup_priority_model
 from app.services.progress_ai import warmup_progress_model
 from app.services.inspector_reminder import start_inspector_reminder_worker
 from app.services.auto_progress_tracker import start_auto_progress_tracker_worker
-app = FastAPI(title="SafeLive Smart Incident Backend")
+class AppJSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_SERIALIZE_NUMPY)
+app = FastAPI(title="SafeLive Smart Incident Backend", default_response_class=AppJSONResponse)
 LOGGER = logging.getLogger(__name__)
 app.add_middleware(
 	CORSMiddleware,
@@ -45,10 +50,17 @@ def _warmup_progress_model_background():
         warmup_progress_model()
     except Exception as exc:
         LOGGER.warning("Ticket progress model warmup failed during startup: %s", exc)
+_background_tasks = []
 @app.on_event("startup")
 def startup():
     init_db()
     threading.Thread(target=_warmup_priority_model_background, daemon=True).start()
     threading.Thread(target=_warmup_progress_model_background, daemon=True).start()
-    start_inspector_reminder_worker()
-    start_auto_progress_tracker_worker()
+    for task in (start_inspector_reminder_worker(), start_auto_progress_tracker_worker()):
+        if task is not None:
+            _background_tasks.append(task)
+@app.on_event("shutdown")
+def shutdown():
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
@@ -18,7 +18,7 @@ from app.services.email_service import (
 )
 from app.services.notification_service import send_stakeholder_notifications
 from app.services.priority_ai import predict_incident_priority
-from app.services.report_validation_ai import validate_incident_report
+from app.services.report_validation_ai import validate_incident_report_async
 from app.config.settings import settings
 from app.issue_model import IssueIn
 from app.auth import get_current_user, get_official_user, is_official_account
@@ -388,7 +388,7 @@ async def create_incident(
     should_alert_stakeholders = True
     critical_email_recipients: list[dict] = []
     if not _is_official(current_user):
-        validation = validate_incident_report(
+        validation = await validate_incident_report_async(
             title=data.get("title"),
             description=data.get("description"),
             category=data.get("category"),
@@ -1,8 +1,13 @@
+import asyncio
 from datetime import datetime, timedelta
 import logging
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pymongo import ReturnDocument
+from pymongo.write_concern import WriteConcern
 from app.auth import get_official_user
-from app.database import incidents, tickets, users
+from app.database import async_incidents, async_tickets, async_users, incidents, tickets, users
 from app.models import TicketAssign, TicketProgressUpdate, TicketUpdateStatus
 from app.roles import normalize_official_role
 from app.services.audit_log import append_incident_log, get_ticket_logbook
@@ -13,11 +18,59 @@ from app.services.ws_manager import manager
 from app.utils import serialize_doc, serialize_list, to_object_id
 router = APIRouter(prefix="/api/tickets")
 LOGGER = logging.getLogger(__name__)
+tickets_fast = tickets.with_options(write_concern=WriteConcern(w=1, j=False))
 ROLE_DEPARTMENT = "department"
 ROLE_SUPERVISOR = "supervisor"
 ROLE_FIELD_INSPECTOR = "field_inspector"
 ROLE_WORKER = "worker"
-TICKET_STATUSES = {"open", "pending", "in_progress", "verified", "resolved"}
+_STATUS_NORMALIZE = {
+    "open": "open",
+    "pending": "pending",
+    "pending_review": "pending",
+    "under_review": "pending",
+    "in_progress": "in_progress",
+    "verified": "verified",
+    "resolved": "resolved",
+}
+TICKET_STATUSES = frozenset(_STATUS_NORMALIZE.values())
+_RESOLVE_ROLES = frozenset({ROLE_DEPARTMENT, ROLE_SUPERVISOR})
+TICKET_LIST_PROJECTION = {
+    "title": 1,
+    "description": 1,
+    "category": 1,
+    "priority": 1,
+    "status": 1,
+    "createdAt": 1,
+    "updatedAt": 1,
+    "location": 1,
+    "latitude": 1,
+    "longitude": 1,
+    "incidentId": 1,
+    "reportedBy": 1,
+    "assignedTo": 1,
+    "assigneeName": 1,
+    "assigneeUserId": 1,
+    "assigneePhone": 1,
+    "assigneeEmail": 1,
+    "workerId": 1,
+    "workerIds": 1,
+    "assignees": 1,
+    "workerSpecialization": 1,
+    "workerSpecializations": 1,
+    "fieldInspectorId": 1,
+    "fieldInspectorName": 1,
+    "progressPercent": 1,
+    "progressSource": 1,
+    "progressConfidence": 1,
+    "progressUpdatedAt": 1,
+    "progressSummary": 1,
+    "lastInspectorUpdateAt": 1,
+    "reopenedBy": 1,
+    "reopenWarning": 1,
+    "reporterPhone": 1,
+    "reporterEmail": 1,
+}
+TICKET_LIST_MAX_LIMIT = 200
 def _now_iso():
     return datetime.utcnow().isoformat()
 def _current_official_role(current_user: dict) -> str:
@@ -63,19 +116,19 @@ def _ticket_scope_query(current_user: dict) -> dict:
             {"status": {"$in": ["open", "pending", "in_progress", "verified"]}},
         )
     return {}
-def _get_ticket_doc(ticket_id: str):
+async def _get_ticket_doc(ticket_id: str):
     try:
         obj_id = to_object_id(ticket_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid ticket id")
-    doc = tickets.find_one({"_id": obj_id})
+    doc = await async_tickets.find_one({"_id": obj_id})
     if not doc:
         raise HTTPException(status_code=404, detail="Ticket not found")
     return doc
 def _can_access_ticket(doc: dict, current_user: dict) -> bool:
     role = _current_official_role(current_user)
     user_id = str(current_user.get("id") or "").strip()
-    if role in {ROLE_DEPARTMENT, ROLE_SUPERVISOR}:
+    if role in _RESOLVE_ROLES:
         return True
     if role == ROLE_WORKER:
         return _is_worker_assigned(doc, user_id)
@@ -85,72 +138,235 @@ def _can_access_ticket(doc: dict, current_user: dict) -> bool:
             return True
         return bool(user_id and field_inspector_id == user_id)
     return False
+_REPORTER_EMAIL_CACHE_TTL_SECONDS = 300
+_REPORTER_EMAIL_CACHE_MAX_ENTRIES = 1024
+_reporter_email_cache: dict[str, tuple[float, str]] = {}
+def _cached_reporter_email(ticket_id: str) -> str | None:
+    entry = _reporter_email_cache.get(ticket_id)
+    if not entry:
+        return None
+    stored_at, email = entry
+    if time.monotonic() - stored_at > _REPORTER_EMAIL_CACHE_TTL_SECONDS:
+        _reporter_email_cache.pop(ticket_id, None)
+        return None
+    return email
+def _store_reporter_email(ticket_id: str, email: str) -> None:
+    if len(_reporter_email_cache) >= _REPORTER_EMAIL_CACHE_MAX_ENTRIES:
+        _reporter_email_cache.clear()
+    _reporter_email_cache[ticket_id] = (time.monotonic(), email)
+def _id_selectors(raw_ids: set[str]) -> list:
+    selectors: list = list(raw_ids)
+    for raw in raw_ids:
+        try:
+            selectors.append(to_object_id(raw))
+        except Exception:
+            pass
+    return selectors
+def _resolve_reporter_emails_batch(docs: list[dict]) -> dict[str, str]:
+    resolved: dict[str, str] = {}
+    pending: list[dict] = []
+    for doc in docs:
+        ticket_id = str(doc.get("_id") or "").strip()
+        direct_email = (doc.get("reporterEmail") or "").strip()
+        if direct_email and "@" in direct_email:
+            if ticket_id:
+                resolved[ticket_id] = direct_email
+            continue
+        if ticket_id:
+            cached = _cached_reporter_email(ticket_id)
+            if cached:
+                resolved[ticket_id] = cached
+                continue
+        pending.append(doc)
+    if not pending:
+        return resolved
+    incident_ids = {(doc.get("incidentId") or "").strip() for doc in pending}
+    incident_ids.discard("")
+    incidents_by_id: dict[str, dict] = {}
+    if incident_ids:
+        for row in incidents.find(
+            {"_id": {"$in": _id_selectors(incident_ids)}},
+            {"reporterEmail": 1, "reporterId": 1, "reporterPhone": 1},
+        ):
+            incidents_by_id[str(row.get("_id"))] = row
+    reporter_ids: set[str] = set()
+    reporter_phones: set[str] = set()
+    for doc in pending:
+        incident_doc = incidents_by_id.get((doc.get("incidentId") or "").strip(), {})
+        reporter_id = (doc.get("reporterId") or incident_doc.get("reporterId") or "").strip()
+        if reporter_id:
+            reporter_ids.add(reporter_id)
+        phone = (doc.get("reporterPhone") or incident_doc.get("reporterPhone") or "").strip()
+        if phone:
+            reporter_phones.add(phone)
+    emails_by_user_id: dict[str, str] = {}
+    if reporter_ids:
+        for row in users.find({"_id": {"$in": _id_selectors(reporter_ids)}}, {"email": 1}):
+            email = (row.get("email") or "").strip()
+            if email and "@" in email:
+                emails_by_user_id[str(row.get("_id"))] = email
+    emails_by_phone: dict[str, str] = {}
+    if reporter_phones:
+        for row in users.find({"phone": {"$in": list(reporter_phones)}}, {"email": 1, "phone": 1}):
+            email = (row.get("email") or "").strip()
+            if email and "@" in email:
+                emails_by_phone[str(row.get("phone") or "").strip()] = email
+    for doc in pending:
+        ticket_id = str(doc.get("_id") or "").strip()
+        incident_doc = incidents_by_id.get((doc.get("incidentId") or "").strip(), {})
+        email = (incident_doc.get("reporterEmail") or "").strip()
+        if not (email and "@" in email):
+            reporter_id = (doc.get("reporterId") or incident_doc.get("reporterId") or "").strip()
+            email = emails_by_user_id.get(reporter_id, "")
+        if not email:
+            phone = (doc.get("reporterPhone") or incident_doc.get("reporterPhone") or "").strip()
+            email = emails_by_phone.get(phone, "")
+        if email and ticket_id:
+            _store_reporter_email(ticket_id, email)
+            resolved[ticket_id] = email
+    return resolved
+def _oid_convert_expr(variable: str) -> dict:
+    return {
+        "$convert": {
+            "input": variable,
+            "to": "objectId",
+            "onError": variable,
+            "onNull": variable,
+        }
+    }
+_REPORTER_EMAIL_PIPELINE_TAIL = [
+    {"$project": {"reporterEmail": 1, "reporterId": 1, "reporterPhone": 1, "incidentId": 1}},
+    {
+        "$lookup": {
+            "from": "incidents",
+            "let": {"incidentId": "$incidentId"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", _oid_convert_expr("$$incidentId")]}}},
+                {"$project": {"reporterEmail": 1, "reporterId": 1, "reporterPhone": 1}},
+            ],
+            "as": "incident",
+        }
+    },
+    {
+        "$lookup": {
+            "from": "users",
+            "let": {
+                "reporterId": {
+                    "$ifNull": ["$reporterId", {"$arrayElemAt": ["$incident.reporterId", 0]}]
+                }
+            },
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$_id", _oid_convert_expr("$$reporterId")]}}},
+                {"$project": {"email": 1}},
+            ],
+            "as": "reporter",
+        }
+    },
+    {
+        "$lookup": {
+            "from": "users",
+            "let": {
+                "phone": {
+                    "$ifNull": ["$reporterPhone", {"$arrayElemAt": ["$incident.reporterPhone", 0]}]
+                }
+            },
+            "pipeline": [
+                # Guard against a missing reporterPhone: $$phone would be
+                # null, and in $expr null == missing, so an unguarded $eq
+                # matches every user without a phone field.
+                {
+                    "$match": {
+                        "$expr": {
+                            "$and": [
+                                {"$gt": ["$$phone", ""]},
+                                {"$eq": ["$phone", "$$phone"]},
+                            ]
+                        }
+                    }
+                },
+                {"$project": {"email": 1}},
+            ],
+            "as": "phoneMatch",
+        }
+    },
+    {
+        "$project": {
+            "direct": "$reporterEmail",
+            "incidentEmail": {"$arrayElemAt": ["$incident.reporterEmail", 0]},
+            "userEmail": {"$arrayElemAt": ["$reporter.email", 0]},
+            "phoneEmail": {"$arrayElemAt": ["$phoneMatch.email", 0]},
+        }
+    },
+]
+def _lookup_reporter_email_joined(ticket_obj_id) -> str | None:
+    pipeline = [{"$match": {"_id": ticket_obj_id}}, *_REPORTER_EMAIL_PIPELINE_TAIL]
+    try:
+        rows = list(tickets.aggregate(pipeline))
+    except Exception:
+        return None
+    if not rows:
+        return None
+    row = rows[0]
+    for key in ("direct", "incidentEmail", "userEmail", "phoneEmail"):
+        email = (row.get(key) or "").strip()
+        if email and "@" in email:
+            return email
+    return None
 def _resolve_ticket_reporter_email(doc: dict) -> str | None:
     direct_email = (doc.get("reporterEmail") or "").strip()
     if direct_email and "@" in direct_email:
         return direct_email
-    incident_doc = None
-    incident_id = (doc.get("incidentId") or "").strip()
-    if incident_id:
-        try:
-            incident_doc = incidents.find_one(
-                {"_id": to_object_id(incident_id)},
-                {"reporterEmail": 1, "reporterId": 1, "reporterPhone": 1},
-            )
-        except Exception:
-            incident_doc = None
-    incident_email = ((incident_doc or {}).get("reporterEmail") or "").strip()
-    if incident_email and "@" in incident_email:
-        return incident_email
-    reporter_id = (doc.get("reporterId") or (incident_doc or {}).get("reporterId") or "").strip()
-    if reporter_id:
-        user_doc = None
+    ticket_id = str(doc.get("_id") or "").strip()
+    if not ticket_id:
+        return None
+    cached = _cached_reporter_email(ticket_id)
+    if cached:
+        return cached
+    email = _lookup_reporter_email_joined(doc.get("_id"))
+    if email is None:
+        return _resolve_reporter_emails_batch([doc]).get(ticket_id)
+    _store_reporter_email(ticket_id, email)
+    return email
+def _send_resolved_email(doc: dict) -> None:
+    reporter_email = _resolve_ticket_reporter_email(doc)
+    if not reporter_email:
+        LOGGER.warning("Resolved email skipped: reporter email unavailable for ticket %s", doc.get("_id"))
+        return
+    if not doc.get("reporterEmail") and doc.get("_id"):
         try:
-            user_doc = users.find_one({"_id": to_object_id(reporter_id)}, {"email": 1})
+            tickets_fast.update_one({"_id": doc.get("_id")}, {"$set": {"reporterEmail": reporter_email}})
         except Exception:
-            user_doc = users.find_one({"_id": reporter_id}, {"email": 1})
-        user_email = ((user_doc or {}).get("email") or "").strip()
-        if user_email and "@" in user_email:
-            return user_email
-    reporter_phone = (doc.get("reporterPhone") or (incident_doc or {}).get("reporterPhone") or "").strip()
-    if reporter_phone:
-        user_doc = users.find_one({"phone": reporter_phone}, {"email": 1})
-        user_email = ((user_doc or {}).get("email") or "").strip()
-        if user_email and "@" in user_email:
-            return user_email
-    return None
-def _notify_ticket_update(doc: dict):
+            pass
+    send_ticket_update_email(
+        reporter_email,
+        doc.get("title", "Ticket"),
+        doc.get("status", "updated"),
+    )
+async def _notify_ticket_update(doc: dict):
     message = f"SafeLive ticket update: {doc.get('title', 'Ticket')} is now {doc.get('status', 'updated')}."
+    channels: list[str] = []
+    sends = []
     if doc.get("reporterPhone"):
-        sms_ok, sms_error = send_sms(doc.get("reporterPhone"), message)
-        if not sms_ok:
-            LOGGER.warning("SMS notification failed for ticket %s: %s", doc.get("_id"), sms_error)
-        wa_ok, wa_error = send_whatsapp(doc.get("reporterPhone"), message)
-        if not wa_ok:
-            LOGGER.warning("WhatsApp notification failed for ticket %s: %s", doc.get("_id"), wa_error)
+        channels.append("SMS")
+        sends.append(asyncio.to_thread(send_sms, doc.get("reporterPhone"), message))
+        channels.append("WhatsApp")
+        sends.append(asyncio.to_thread(send_whatsapp, doc.get("reporterPhone"), message))
     status_value = (doc.get("status") or "").strip().lower()
-    reporter_email = _resolve_ticket_reporter_email(doc)
-    if reporter_email and not doc.get("reporterEmail") and doc.get("_id"):
-        try:
-            tickets.update_one({"_id": doc.get("_id")}, {"$set": {"reporterEmail": reporter_email}})
-        except Exception:
-            pass
-    if reporter_email and status_value == "resolved":
-        try:
-            send_ticket_update_email(
-                reporter_email,
-                doc.get("title", "Ticket"),
-                doc.get("status", "updated"),
-            )
-        except Exception as exc:
-            LOGGER.warning("Email notification failed for ticket %s: %s", doc.get("_id"), exc)
-    elif status_value == "resolved":
-        LOGGER.warning("Resolved email skipped: reporter email unavailable for ticket %s", doc.get("_id"))
+    if status_value == "resolved":
+        channels.append("Email")
+        sends.append(asyncio.to_thread(_send_resolved_email, doc))
+    if not sends:
+        return
+    results = await asyncio.gather(*sends, return_exceptions=True)
+    for channel, result in zip(channels, results):
+        if isinstance(result, BaseException):
+            LOGGER.warning("%s notification failed for ticket %s: %s", channel, doc.get("_id"), result)
+        elif isinstance(result, tuple):
+            ok, error = result
+            if not ok:
+                LOGGER.warning("%s notification failed for ticket %s: %s", channel, doc.get("_id"), error)
 def _normalize_ticket_status(value: str) -> str:
-    status = (value or "").strip().lower()
-    if status in {"pending_review", "under_review"}:
-        return "pending"
-    return status
+    return _STATUS_NORMALIZE.get((value or "").strip().lower(), "")
 def _is_reopened_case(doc: dict) -> bool:
     reopened_by = doc.get("reopenedBy")
     if isinstance(reopened_by, dict):
@@ -171,13 +387,14 @@ def _incident_selector_from_ticket(doc: dict) -> dict | None:
         return {"_id": to_object_id(incident_id)}
     except Exception:
         return {"_id": incident_id}
-def _sync_incident_from_ticket(doc: dict, updates: dict):
+async def _sync_incident_from_ticket(doc: dict, updates: dict):
     selector = _incident_selector_from_ticket(doc)
     if not selector or not updates:
         return
-    incidents.update_one(selector, {"$set": updates})
-def _record_ticket_log(action: str, ticket_doc: dict, actor: dict, details: dict | None = None):
-    append_incident_log(
+    await async_incidents.update_one(selector, {"$set": updates})
+async def _record_ticket_log(action: str, ticket_doc: dict, actor: dict, details: dict | None = None):
+    await run_in_threadpool(
+        append_incident_log,
         ticket_id=str(ticket_doc.get("_id") or ""),
         incident_id=(ticket_doc.get("incidentId") or ""),
         action=action,
@@ -199,55 +416,40 @@ def _build_note_payload(note_text: str, current_user: dict):
         "createdAt": _now_iso(),
         "by": current_user.get("id"),
     }
+def _dedup_worker_ids(candidates: list) -> list[str]:
+    return list(
+        dict.fromkeys(
+            filter(None, (str(value).strip() if value else "" for value in candidates))
+        )
+    )
 def _extract_worker_ids_from_ticket(doc: dict) -> list[str]:
-    ordered: list[str] = []
-    seen: set[str] = set()
-    def _append(value: str | None):
-        worker_id = str(value or "").strip()
-        if not worker_id or worker_id in seen:
-            return
-        seen.add(worker_id)
-        ordered.append(worker_id)
-    _append(doc.get("assigneeUserId"))
-    _append(doc.get("workerId"))
+    candidates = [doc.get("assigneeUserId"), doc.get("workerId")]
     worker_ids = doc.get("workerIds")
     if isinstance(worker_ids, list):
-        for row in worker_ids:
-            _append(row)
+        candidates.extend(worker_ids)
     assignees = doc.get("assignees")
     if isinstance(assignees, list):
-        for row in assignees:
-            if isinstance(row, dict):
-                _append(row.get("workerId"))
-    return ordered
+        candidates.extend(row.get("workerId") for row in assignees if isinstance(row, dict))
+    return _dedup_worker_ids(candidates)
 def _is_worker_assigned(doc: dict, worker_user_id: str) -> bool:
     candidate = str(worker_user_id or "").strip()
     if not candidate:
         return False
-    return candidate in set(_extract_worker_ids_from_ticket(doc))
+    return candidate in _extract_worker_ids_from_ticket(doc)
 def _normalize_assignment_worker_ids(payload: TicketAssign) -> list[str]:
-    ordered: list[str] = []
-    seen: set[str] = set()
-    def _append(value: str | None):
-        worker_id = str(value or "").strip()
-        if not worker_id or worker_id in seen:
-            return
-        seen.add(worker_id)
-        ordered.append(worker_id)
-    _append(payload.workerId)
+    candidates = [payload.workerId]
     if isinstance(payload.workerIds, list):
-        for row in payload.workerIds:
-            _append(str(row or ""))
-    return ordered
-def _find_worker_doc(worker_id: str | None):
+        candidates.extend(payload.workerIds)
+    return _dedup_worker_ids(candidates)
+async def _find_worker_doc(worker_id: str | None):
     candidate = (worker_id or "").strip()
     if not candidate:
         return None
     doc = None
     try:
-        doc = users.find_one({"_id": to_object_id(candidate)})
+        doc = await async_users.find_one({"_id": to_object_id(candidate)})
     except Exception:
-        doc = users.find_one({"_id": candidate})
+        doc = await async_users.find_one({"_id": candidate})
     if not doc:
         return None
     if doc.get("userType") != "official":
@@ -262,8 +464,8 @@ def _notify_ticket_reopened(doc: dict, reopened_by: dict):
         f"SafeLive notice: Ticket '{ticket_title}' has been reopened by {department_name}. "
         "Supervisor should review and reassign as needed."
     )
-    assignee_phones: set[str] = set()
-    assignee_emails: set[str] = set()
+    assignee_phones: dict[str, None] = {}
+    assignee_emails: dict[str, None] = {}
     assignees = doc.get("assignees")
     if isinstance(assignees, list):
         for row in assignees:
@@ -272,15 +474,15 @@ def _notify_ticket_reopened(doc: dict, reopened_by: dict):
             phone = (row.get("phone") or "").strip()
             email = (row.get("email") or "").strip()
             if phone:
-                assignee_phones.add(phone)
+                assignee_phones[phone] = None
             if email:
-                assignee_emails.add(email)
+                assignee_emails[email] = None
     primary_phone = (doc.get("assigneePhone") or "").strip()
     primary_email = (doc.get("assigneeEmail") or "").strip()
     if primary_phone:
-        assignee_phones.add(primary_phone)
+        assignee_phones[primary_phone] = None
     if primary_email:
-        assignee_emails.add(primary_email)
+        assignee_emails[primary_email] = None
     for worker_id in _extract_worker_ids_from_ticket(doc):
         try:
             worker_doc = users.find_one({"_id": to_object_id(worker_id)})
@@ -291,17 +493,17 @@ def _notify_ticket_reopened(doc: dict, reopened_by: dict):
         worker_phone = str(worker_doc.get("phone") or "").strip()
         worker_email = str(worker_doc.get("email") or "").strip()
         if worker_phone:
-            assignee_phones.add(worker_phone)
+            assignee_phones[worker_phone] = None
         if worker_email:
-            assignee_emails.add(worker_email)
-    for phone in sorted(assignee_phones):
+            assignee_emails[worker_email] = None
+    for phone in assignee_phones:
         sms_ok, sms_err = send_sms(phone, message)
         if not sms_ok and sms_err:
             LOGGER.warning("Ticket %s reopen SMS failed for %s: %s", doc.get("_id"), phone, sms_err)
         wa_ok, wa_err = send_whatsapp(phone, message)
         if not wa_ok and wa_err:
             LOGGER.warning("Ticket %s reopen WhatsApp failed for %s: %s", doc.get("_id"), phone, wa_err)
-    for email in sorted(assignee_emails):
+    for email in assignee_emails:
         try:
             send_ticket_update_email(email, ticket_title, "Reopened by Department")
         except Exception as exc:
@@ -312,7 +514,7 @@ def _notify_ticket_reopened(doc: dict, reopened_by: dict):
         "departmentName": department_name,
     }
     try:
-        tickets.update_one(
+        tickets_fast.update_one(
             {"_id": doc.get("_id")},
             {
                 "$set": {
@@ -324,17 +526,31 @@ def _notify_ticket_reopened(doc: dict, reopened_by: dict):
     except Exception as exc:
         LOGGER.warning("Ticket %s warning persistence failed: %s", doc.get("_id"), exc)
 @router.get("/stats")
-def get_stats(current_user: dict = Depends(get_official_user)):
+async def get_stats(current_user: dict = Depends(get_official_user)):
     scope = _ticket_scope_query(current_user)
-    total = tickets.count_documents(scope)
-    open_t = tickets.count_documents(_merge_queries(scope, {"status": "open"}))
-    pending_t = tickets.count_documents(_merge_queries(scope, {"status": "pending"}))
-    in_prog = tickets.count_documents(_merge_queries(scope, {"status": {"$in": ["in_progress", "verified"]}}))
-    resolved = tickets.count_documents(_merge_queries(scope, {"status": "resolved"}))
     since = (datetime.utcnow() - timedelta(days=1)).isoformat()
-    resolved_today = tickets.count_documents(
-        _merge_queries(scope, {"status": "resolved", "updatedAt": {"$gte": since}})
-    )
+    pipeline = [
+        {"$match": scope},
+        {
+            "$facet": {
+                "byStatus": [{"$group": {"_id": "$status", "n": {"$sum": 1}}}],
+                "resolvedToday": [
+                    {"$match": {"status": "resolved", "updatedAt": {"$gte": since}}},
+                    {"$count": "n"},
+                ],
+            }
+        },
+    ]
+    rows = await async_tickets.aggregate(pipeline).to_list(length=1)
+    facets = rows[0] if rows else {}
+    counts = {str(row.get("_id") or ""): int(row.get("n") or 0) for row in facets.get("byStatus") or []}
+    total = sum(counts.values())
+    open_t = counts.get("open", 0)
+    pending_t = counts.get("pending", 0)
+    in_prog = counts.get("in_progress", 0) + counts.get("verified", 0)
+    resolved = counts.get("resolved", 0)
+    resolved_rows = facets.get("resolvedToday") or []
+    resolved_today = int(resolved_rows[0].get("n") or 0) if resolved_rows else 0
     resolution_rate = round((resolved / total) * 100, 2) if total > 0 else 0
     avg_response = "N/A"
     return {
@@ -350,10 +566,12 @@ def get_stats(current_user: dict = Depends(get_official_user)):
         },
     }
 @router.get("")
-def get_tickets(
+async def get_tickets(
     status: str | None = None,
     priority: str | None = None,
     category: str | None = None,
+    limit: int = 50,
+    offset: int = 0,
     current_user: dict = Depends(get_official_user),
 ):
     query = _ticket_scope_query(current_user)
@@ -363,28 +581,42 @@ def get_tickets(
         query = _merge_queries(query, {"priority": priority})
     if category:
         query = _merge_queries(query, {"category": category})
-    data = list(tickets.find(query).sort("createdAt", -1))
-    return {"success": True, "data": serialize_list(data)}
+    limit = max(1, min(limit, TICKET_LIST_MAX_LIMIT))
+    offset = max(0, offset)
+    cursor = (
+        async_tickets.find(query, TICKET_LIST_PROJECTION)
+        .sort("createdAt", -1)
+        .skip(offset)
+        .limit(limit)
+        .batch_size(min(limit, 100))
+    )
+    data = serialize_list(await cursor.to_list(length=limit))
+    return {"success": True, "data": data, "nextOffset": offset + len(data)}
 @router.get("/{ticket_id}")
-def get_ticket(ticket_id: str, current_user: dict = Depends(get_official_user)):
-    doc = _get_ticket_doc(ticket_id)
+async def get_ticket(ticket_id: str, current_user: dict = Depends(get_official_user)):
+    doc = await _get_ticket_doc(ticket_id)
     if not _can_access_ticket(doc, current_user):
         raise HTTPException(status_code=403, detail="Access denied")
     return {"success": True, "data": serialize_doc(doc)}
 @router.patch("/{ticket_id}/status")
-def update_status(ticket_id: str, payload: TicketUpdateStatus, current_user: dict = Depends(get_official_user)):
-    existing = _get_ticket_doc(ticket_id)
+async def update_status(
+    ticket_id: str,
+    payload: TicketUpdateStatus,
+    background: BackgroundTasks,
+    current_user: dict = Depends(get_official_user),
+):
+    existing = await _get_ticket_doc(ticket_id)
     if not _can_access_ticket(existing, current_user):
         raise HTTPException(status_code=403, detail="Access denied")
     role = _current_official_role(current_user)
     normalized_status = _normalize_ticket_status(payload.status)
-    if normalized_status not in TICKET_STATUSES:
+    if not normalized_status:
         raise HTTPException(status_code=400, detail="Invalid status")
     is_reopened_case = _is_reopened_case(existing)
     was_resolved = (existing.get("status") or "").strip().lower() == "resolved"
     reopening = normalized_status == "open" and was_resolved
     if normalized_status == "resolved":
-        if role not in {ROLE_DEPARTMENT, ROLE_SUPERVISOR}:
+        if role not in _RESOLVE_ROLES:
             raise HTTPException(status_code=403, detail="Only department or supervisor can mark tickets resolved")
         if role == ROLE_SUPERVISOR and is_reopened_case:
             raise HTTPException(status_code=403, detail="Supervisor can only resolve new (not reopened) tickets")
@@ -400,7 +632,7 @@ def update_status(ticket_id: str, payload: TicketUpdateStatus, current_user: dic
                 status_code=403,
                 detail="Only supervisor can verify tickets. Department can verify reopened tickets only",
             )
-    if normalized_status in {"open", "pending", "in_progress"} and role not in {ROLE_DEPARTMENT, ROLE_SUPERVISOR}:
+    if normalized_status in {"open", "pending", "in_progress"} and role not in _RESOLVE_ROLES:
         raise HTTPException(status_code=403, detail="Only department or supervisor can set this status")
     now = _now_iso()
     update = {"status": normalized_status, "updatedAt": now}
@@ -417,42 +649,41 @@ def update_status(ticket_id: str, payload: TicketUpdateStatus, current_user: dic
     if clear_warning:
         op.setdefault("$unset", {})["reopenWarning"] = ""
     obj_id = to_object_id(ticket_id)
-    tickets.update_one({"_id": obj_id}, op)
-    doc = tickets.find_one({"_id": obj_id})
+    incident_status = "in_progress" if normalized_status == "verified" else normalized_status
+    doc = await async_tickets.find_one_and_update({"_id": obj_id}, op, return_document=ReturnDocument.AFTER)
+    await _sync_incident_from_ticket(
+        existing,
+        {
+            "status": incident_status,
+            "updatedAt": now,
+        },
+    )
     if doc:
-        incident_status = "in_progress" if doc.get("status") == "verified" else doc.get("status")
-        _sync_incident_from_ticket(
-            doc,
-            {
-                "status": incident_status,
-                "updatedAt": doc.get("updatedAt"),
-            },
-        )
-        _notify_ticket_update(doc)
+        background.add_task(_notify_ticket_update, doc)
         if reopening:
-            _notify_ticket_reopened(doc, current_user)
-            _record_ticket_log(
+            await run_in_threadpool(_notify_ticket_reopened, doc, current_user)
+            await _record_ticket_log(
                 "ticket_reopened_by_department",
                 doc,
                 current_user,
                 details={"fromStatus": existing.get("status"), "toStatus": doc.get("status")},
             )
         elif normalized_status == "resolved":
-            _record_ticket_log(
+            await _record_ticket_log(
                 "ticket_resolved_by_department" if role == ROLE_DEPARTMENT else "ticket_resolved_by_supervisor",
                 doc,
                 current_user,
                 details={"fromStatus": existing.get("status"), "toStatus": doc.get("status")},
             )
         elif normalized_status == "verified":
-            _record_ticket_log(
+            await _record_ticket_log(
                 "ticket_verified_by_supervisor" if role == ROLE_SUPERVISOR else "ticket_verified_by_department",
                 doc,
                 current_user,
                 details={"fromStatus": existing.get("status"), "toStatus": doc.get("status")},
             )
         else:
-            _record_ticket_log(
+            await _record_ticket_log(
                 "ticket_status_updated",
                 doc,
                 current_user,
@@ -461,8 +692,13 @@ def update_status(ticket_id: str, payload: TicketUpdateStatus, current_user: dic
         _emit_ticket_realtime_event("TICKET_UPDATED", doc, "status_changed")
     return {"success": True, "data": serialize_doc(doc)}
 @router.post("/{ticket_id}/assign")
-def assign_ticket(ticket_id: str, payload: TicketAssign, current_user: dict = Depends(get_official_user)):
-    existing = _get_ticket_doc(ticket_id)
+async def assign_ticket(
+    ticket_id: str,
+    payload: TicketAssign,
+    background: BackgroundTasks,
+    current_user: dict = Depends(get_official_user),
+):
+    existing = await _get_ticket_doc(ticket_id)
     if not _can_access_ticket(existing, current_user):
         raise HTTPException(status_code=403, detail="Access denied")
     role = _current_official_role(current_user)
@@ -480,7 +716,7 @@ def assign_ticket(ticket_id: str, payload: TicketAssign, current_user: dict = De
         raise HTTPException(status_code=400, detail="At least one workerId is required for assignment")
     assignees: list[dict] = []
     for worker_id in assignment_worker_ids:
-        worker_doc = _find_worker_doc(worker_id)
+        worker_doc = await _find_worker_doc(worker_id)
         if not worker_doc:
             raise HTTPException(status_code=400, detail=f"Selected worker account not found: {worker_id}")
         worker_payload = serialize_doc(worker_doc) or {}
@@ -533,26 +769,25 @@ def assign_ticket(ticket_id: str, payload: TicketAssign, current_user: dict = De
     if payload.notes:
         op["$push"] = {"notes": _build_note_payload(payload.notes, current_user)}
     obj_id = to_object_id(ticket_id)
-    tickets.update_one({"_id": obj_id}, op)
-    doc = tickets.find_one({"_id": obj_id})
+    doc = await async_tickets.find_one_and_update({"_id": obj_id}, op, return_document=ReturnDocument.AFTER)
+    await _sync_incident_from_ticket(
+        existing,
+        {
+            "assignedTo": update["assignedTo"],
+            "assigneeName": update["assigneeName"],
+            "assigneePhone": update["assigneePhone"],
+            "assigneeEmail": update["assigneeEmail"],
+            "assigneeUserId": update["assigneeUserId"],
+            "workerId": update["workerId"],
+            "workerIds": update["workerIds"],
+            "assignees": update["assignees"],
+            "workerSpecialization": update["workerSpecialization"],
+            "workerSpecializations": update["workerSpecializations"],
+            "updatedAt": now,
+        },
+    )
     if doc:
-        _sync_incident_from_ticket(
-            doc,
-            {
-                "assignedTo": doc.get("assignedTo"),
-                "assigneeName": doc.get("assigneeName"),
-                "assigneePhone": doc.get("assigneePhone"),
-                "assigneeEmail": doc.get("assigneeEmail"),
-                "assigneeUserId": doc.get("assigneeUserId"),
-                "workerId": doc.get("workerId"),
-                "workerIds": doc.get("workerIds"),
-                "assignees": doc.get("assignees"),
-                "workerSpecialization": doc.get("workerSpecialization"),
-                "workerSpecializations": doc.get("workerSpecializations"),
-                "updatedAt": doc.get("updatedAt"),
-            },
-        )
-        _record_ticket_log(
+        await _record_ticket_log(
             "worker_assigned_by_supervisor" if role == ROLE_SUPERVISOR else "worker_assigned_by_department",
             doc,
             current_user,
@@ -562,17 +797,17 @@ def assign_ticket(ticket_id: str, payload: TicketAssign, current_user: dict = De
                 "workerCount": len(assignees),
             },
         )
-        _notify_ticket_update(doc)
+        background.add_task(_notify_ticket_update, doc)
         _emit_ticket_realtime_event("TICKET_UPDATED", doc, "workers_assigned")
     return {"success": True, "data": serialize_doc(doc)}
 @router.post("/{ticket_id}/progress-update")
-def update_ticket_progress(
+async def update_ticket_progress(
     ticket_id: str,
     payload: TicketProgressUpdate,
     current_user: dict = Depends(get_official_user),
 ):
     role = _ensure_roles(current_user, ROLE_FIELD_INSPECTOR, ROLE_WORKER)
-    existing = _get_ticket_doc(ticket_id)
+    existing = await _get_ticket_doc(ticket_id)
     if not _can_access_ticket(existing, current_user):
         raise HTTPException(status_code=403, detail="Access denied")
     if (existing.get("status") or "").strip().lower() == "resolved":
@@ -580,7 +815,7 @@ def update_ticket_progress(
     update_text = (payload.updateText or "").strip()
     if len(update_text) < 5:
         raise HTTPException(status_code=400, detail="updateText must be at least 5 characters")
-    prediction = predict_ticket_progress(update_text)
+    prediction = await run_in_threadpool(predict_ticket_progress, update_text)
     now = _now_iso()
     progress_percent = int(max(0, min(100, prediction.percent)))
     confidence = round(max(0.0, min(1.0, float(prediction.confidence))), 4)
@@ -602,27 +837,27 @@ def update_ticket_progress(
     note_prefix = "Field Inspector update" if role == ROLE_FIELD_INSPECTOR else "Worker update"
     note_text = f"{note_prefix}: {update_text} ({progress_percent}%)"
     obj_id = to_object_id(ticket_id)
-    tickets.update_one(
+    doc = await async_tickets.find_one_and_update(
         {"_id": obj_id},
         {
             "$set": set_payload,
             "$push": {"notes": _build_note_payload(note_text, current_user)},
         },
+        return_document=ReturnDocument.AFTER,
+    )
+    await _sync_incident_from_ticket(
+        existing,
+        {
+            "progressPercent": progress_percent,
+            "progressSource": prediction.source,
+            "progressConfidence": confidence,
+            "progressUpdatedAt": now,
+            "updatedAt": now,
+        },
     )
-    doc = tickets.find_one({"_id": obj_id})
     if doc:
-        _sync_incident_from_ticket(
-            doc,
-            {
-                "progressPercent": doc.get("progressPercent"),
-                "progressSource": doc.get("progressSource"),
-                "progressConfidence": doc.get("progressConfidence"),
-                "progressUpdatedAt": doc.get("progressUpdatedAt"),
-                "updatedAt": doc.get("updatedAt"),
-            },
-        )
         action = "field_inspector_progress_update" if role == ROLE_FIELD_INSPECTOR else "worker_progress_update"
-        _record_ticket_log(
+        await _record_ticket_log(
             action,
             doc,
             current_user,
@@ -636,8 +871,8 @@ def update_ticket_progress(
         _emit_ticket_realtime_event("TICKET_UPDATED", doc, "progress_updated")
     return {"success": True, "data": serialize_doc(doc)}
 @router.get("/{ticket_id}/logbook")
-def get_ticket_logbook_entries(ticket_id: str, current_user: dict = Depends(get_official_user)):
+async def get_ticket_logbook_entries(ticket_id: str, current_user: dict = Depends(get_official_user)):
     _ensure_roles(current_user, ROLE_DEPARTMENT)
-    _ = _get_ticket_doc(ticket_id)
-    data = get_ticket_logbook(ticket_id)
+    _ = await _get_ticket_doc(ticket_id)
+    data = await run_in_threadpool(get_ticket_logbook, ticket_id)
     return {"success": True, "data": data}
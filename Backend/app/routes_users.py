@@ -1,7 +1,7 @@
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from app.auth import get_current_user, require_official_roles
-from app.database import users
+from app.database import async_users
 from app.models import UserUpdate
 from app.roles import normalize_official_role
 from app.utils import serialize_doc, to_object_id
@@ -11,7 +11,7 @@ router = APIRouter(prefix="/api/users")
 def get_profile(current_user: dict = Depends(get_current_user)):
     return {"success": True, "data": current_user}
 @router.put("/profile")
-def update_profile(payload: UserUpdate, current_user: dict = Depends(get_current_user)):
+async def update_profile(payload: UserUpdate, current_user: dict = Depends(get_current_user)):
     user_id = current_user.get("id")
     if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
@@ -21,33 +21,30 @@ def update_profile(payload: UserUpdate, current_user: dict = Depends(get_current
     updates["updatedAt"] = datetime.utcnow().isoformat()
     obj_id = to_object_id(user_id)
     try:
-        users.update_one({"_id": obj_id}, {"$set": updates})
+        await async_users.update_one({"_id": obj_id}, {"$set": updates})
     except DuplicateKeyError:
         raise HTTPException(status_code=400, detail="Email or phone already in use")
-    user = users.find_one({"_id": obj_id})
+    user = await async_users.find_one({"_id": obj_id})
     data = serialize_doc(user)
     if data:
         data.pop("password", None)
     return {"success": True, "data": data}
+WORKER_LIST_PIPELINE = [
+    {"$match": {"userType": "official", "officialRole": "worker"}},
+    {"$sort": {"name": 1}},
+    {
+        "$project": {
+            "_id": 0,
+            "id": {"$toString": "$_id"},
+            "name": {"$ifNull": ["$name", {"$ifNull": ["$email", "$phone"]}]},
+            "phone": 1,
+            "email": 1,
+            "officialRole": {"$literal": normalize_official_role("worker")},
+            "workerSpecialization": {"$ifNull": ["$workerSpecialization", "Other"]},
+        }
+    },
+]
 @router.get("/workers")
-def list_workers(current_user: dict = Depends(require_official_roles("department", "supervisor"))):
-    rows = list(
-        users.find(
-            {"userType": "official", "officialRole": "worker"},
-            {"name": 1, "phone": 1, "email": 1, "workerSpecialization": 1},
-        ).sort("name", 1)
-    )
-    data = []
-    for row in rows:
-        payload = serialize_doc(row) or {}
-        data.append(
-            {
-                "id": payload.get("id"),
-                "name": payload.get("name") or payload.get("email") or payload.get("phone"),
-                "phone": payload.get("phone"),
-                "email": payload.get("email"),
-                "officialRole": normalize_official_role("worker"),
-                "workerSpecialization": payload.get("workerSpecialization") or "Other",
-            }
-        )
+async def list_workers(current_user: dict = Depends(require_official_roles("department", "supervisor"))):
+    data = await async_users.aggregate(WORKER_LIST_PIPELINE).to_list(length=None)
     return {"success": True, "data": data}
@@ -25,5 +25,5 @@ def append_incident_log(
     }
     incident_logs.insert_one(log_doc)
 def get_ticket_logbook(ticket_id: str) -> list[dict]:
-    rows = list(incident_logs.find({"ticketId": ticket_id}).sort("createdAt", -1))
-    return serialize_list(rows)
+    cursor = incident_logs.find({"ticketId": ticket_id}).sort("createdAt", -1).batch_size(500)
+    return serialize_list(cursor)
@@ -1,8 +1,11 @@
 from __future__ import annotations
+import asyncio
 import logging
 import threading
-import time
 from datetime import datetime
+from functools import lru_cache
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
 from app.config.settings import settings
 from app.database import incidents, tickets
 from app.services.progress_ai import predict_ticket_progress
@@ -11,13 +14,15 @@ from app.utils import serialize_doc, to_object_id
 LOGGER = logging.getLogger(__name__)
 def _now_iso() -> str:
     return datetime.utcnow().isoformat()
+_STATUS_MAP = {
+    "verified": "in_progress",
+    "pending": "open",
+    "pending_review": "open",
+    "under_review": "open",
+}
 def _normalize_status(value: str | None) -> str:
     status = (value or "").strip().lower()
-    if status == "verified":
-        return "in_progress"
-    if status in {"pending", "pending_review", "under_review"}:
-        return "open"
-    return status
+    return _STATUS_MAP.get(status, status)
 def _has_assigned_workers(doc: dict) -> bool:
     worker_id = str(doc.get("workerId") or "").strip()
     if worker_id:
@@ -50,20 +55,29 @@ def _latest_note_text(doc: dict) -> str:
             if note:
                 return note
     return ""
-def _build_progress_context(doc: dict) -> str:
-    status = _normalize_status(doc.get("status"))
-    has_team = _has_assigned_workers(doc)
-    latest_note = _latest_note_text(doc)
+@lru_cache(maxsize=2048)
+def _compose_progress_context(
+    title: str, category: str, priority: str, status: str, has_team: bool, latest_note: str
+) -> str:
     context_parts = [
-        f"title: {doc.get('title') or ''}",
-        f"category: {doc.get('category') or ''}",
-        f"priority: {doc.get('priority') or ''}",
+        f"title: {title}",
+        f"category: {category}",
+        f"priority: {priority}",
         f"status: {status or 'open'}",
         "workers assigned" if has_team else "workers not assigned",
     ]
     if latest_note:
         context_parts.append(f"latest update: {latest_note}")
     return ". ".join(part for part in context_parts if part)
+def _build_progress_context(doc: dict) -> str:
+    return _compose_progress_context(
+        doc.get("title") or "",
+        doc.get("category") or "",
+        doc.get("priority") or "",
+        _normalize_status(doc.get("status")),
+        _has_assigned_workers(doc),
+        _latest_note_text(doc),
+    )
 def _estimate_ticket_progress(doc: dict) -> tuple[int, float, str]:
     status = _normalize_status(doc.get("status"))
     has_team = _has_assigned_workers(doc)
@@ -78,15 +92,15 @@ def _estimate_ticket_progress(doc: dict) -> tuple[int, float, str]:
     if has_team and status == "in_progress":
         percent = max(percent, 10)
     return percent, float(prediction.confidence), prediction.source
-def _sync_incident_progress(ticket_doc: dict, percent: int, source: str, confidence: float, updated_at: str) -> None:
+def _incident_progress_op(ticket_doc: dict, percent: int, source: str, confidence: float, updated_at: str) -> UpdateOne | None:
     incident_id = str(ticket_doc.get("incidentId") or "").strip()
     if not incident_id:
-        return
+        return None
     try:
         selector = {"_id": to_object_id(incident_id)}
     except Exception:
         selector = {"_id": incident_id}
-    incidents.update_one(
+    return UpdateOne(
         selector,
         {
             "$set": {
@@ -97,65 +111,180 @@ def _sync_incident_progress(ticket_doc: dict, percent: int, source: str, confide
             }
         },
     )
+def _flush_progress_ops(ticket_ops: list[UpdateOne], incident_ops: list[UpdateOne]) -> None:
+    if ticket_ops:
+        tickets.bulk_write(ticket_ops, ordered=False)
+        ticket_ops.clear()
+    if incident_ops:
+        incidents.bulk_write(incident_ops, ordered=False)
+        incident_ops.clear()
+TICKET_PASS_PROJECTION = {
+    "status": 1,
+    "progressPercent": 1,
+    "progressSource": 1,
+    "progressConfidence": 1,
+    "progressSummary": 1,
+    "notes": 1,
+    "workerId": 1,
+    "workerIds": 1,
+    "assignees": 1,
+    "title": 1,
+    "category": 1,
+    "priority": 1,
+    "incidentId": 1,
+}
+BULK_FLUSH_SIZE = 500
+def _compute_progress_update(doc: dict) -> tuple[int, str, float] | None:
+    percent, confidence, source = _estimate_ticket_progress(doc)
+    confidence = round(max(0.0, min(1.0, confidence)), 4)
+    current_percent = int(doc.get("progressPercent") or 0)
+    status = _normalize_status(doc.get("status"))
+    if status in {"open", "in_progress"} and current_percent > 0:
+        percent = max(percent, current_percent)
+    current_source = str(doc.get("progressSource") or "")
+    current_confidence = float(doc.get("progressConfidence") or 0.0)
+    if (
+        current_percent == percent
+        and current_source == source
+        and round(current_confidence, 4) == confidence
+    ):
+        return None
+    return percent, source, confidence
+def _publish_ticket_progress(doc: dict, percent: int, source: str, confidence: float, now: str) -> None:
+    updated_doc = dict(doc)
+    updated_doc.update(
+        {
+            "progressPercent": percent,
+            "progressSource": source,
+            "progressConfidence": confidence,
+            "progressUpdatedAt": now,
+        }
+    )
+    manager.publish(
+        {
+            "type": "TICKET_UPDATED",
+            "reason": "auto_progress_tracker",
+            "data": serialize_doc(updated_doc),
+        }
+    )
 def run_auto_progress_pass() -> None:
     query = {"status": {"$in": ["open", "pending", "in_progress", "resolved", "verified"]}}
-    cursor = tickets.find(query)
+    cursor = tickets.find(query, TICKET_PASS_PROJECTION).batch_size(500)
+    ticket_ops: list[UpdateOne] = []
+    incident_ops: list[UpdateOne] = []
     for doc in cursor:
-        percent, confidence, source = _estimate_ticket_progress(doc)
-        confidence = round(max(0.0, min(1.0, confidence)), 4)
-        current_percent = int(doc.get("progressPercent") or 0)
-        status = _normalize_status(doc.get("status"))
-        if status in {"open", "in_progress"} and current_percent > 0:
-            percent = max(percent, current_percent)
-        current_source = str(doc.get("progressSource") or "")
-        current_confidence = float(doc.get("progressConfidence") or 0.0)
-        if (
-            current_percent == percent
-            and current_source == source
-            and round(current_confidence, 4) == confidence
-        ):
+        update = _compute_progress_update(doc)
+        if update is None:
             continue
+        percent, source, confidence = update
         now = _now_iso()
-        tickets.update_one(
-            {"_id": doc.get("_id")},
-            {
-                "$set": {
-                    "progressPercent": percent,
-                    "progressSource": source,
-                    "progressConfidence": confidence,
-                    "progressUpdatedAt": now,
-                }
-            },
+        ticket_ops.append(
+            UpdateOne(
+                {"_id": doc.get("_id")},
+                {
+                    "$set": {
+                        "progressPercent": percent,
+                        "progressSource": source,
+                        "progressConfidence": confidence,
+                        "progressUpdatedAt": now,
+                    }
+                },
+            )
         )
-        _sync_incident_progress(doc, percent, source, confidence, now)
-        updated_doc = dict(doc)
-        updated_doc.update(
-            {
-                "progressPercent": percent,
-                "progressSource": source,
-                "progressConfidence": confidence,
-                "progressUpdatedAt": now,
-            }
-        )
-        manager.publish(
-            {
-                "type": "TICKET_UPDATED",
-                "reason": "auto_progress_tracker",
-                "data": serialize_doc(updated_doc),
-            }
-        )
-def _worker_loop() -> None:
-    interval = max(int(settings.PROGRESS_TRACKER_INTERVAL_SECONDS), 15)
-    while True:
-        try:
-            if settings.PROGRESS_TRACKER_ENABLED:
-                run_auto_progress_pass()
-        except Exception as exc:
-            LOGGER.warning("Auto progress tracker loop failed: %s", exc)
-        time.sleep(interval)
-def start_auto_progress_tracker_worker() -> None:
+        incident_op = _incident_progress_op(doc, percent, source, confidence, now)
+        if incident_op:
+            incident_ops.append(incident_op)
+        if len(ticket_ops) >= BULK_FLUSH_SIZE:
+            _flush_progress_ops(ticket_ops, incident_ops)
+        # The pass cursor is projected, but TICKET_UPDATED replaces the row
+        # wholesale on the client, so publish the complete document (with
+        # the new progress fields overlaid) rather than the slim pass doc.
+        full_doc = tickets.find_one({"_id": doc.get("_id")})
+        _publish_ticket_progress(full_doc or doc, percent, source, confidence, now)
+    _flush_progress_ops(ticket_ops, incident_ops)
+_PROGRESS_FIELDS = frozenset(
+    {"progressPercent", "progressSource", "progressConfidence", "progressUpdatedAt"}
+)
+_CHANGE_STREAM_PIPELINE = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+_SAFETY_NET_INTERVAL_SECONDS = 600
+def _is_progress_only_change(change: dict) -> bool:
+    updated_fields = (change.get("updateDescription") or {}).get("updatedFields") or {}
+    return bool(updated_fields) and set(updated_fields).issubset(_PROGRESS_FIELDS)
+def _process_changed_ticket(doc: dict) -> None:
+    update = _compute_progress_update(doc)
+    if update is None:
+        return
+    percent, source, confidence = update
+    now = _now_iso()
+    _flush_progress_ops(
+        [
+            UpdateOne(
+                {"_id": doc.get("_id")},
+                {
+                    "$set": {
+                        "progressPercent": percent,
+                        "progressSource": source,
+                        "progressConfidence": confidence,
+                        "progressUpdatedAt": now,
+                    }
+                },
+            )
+        ],
+        [op for op in [_incident_progress_op(doc, percent, source, confidence, now)] if op],
+    )
+    _publish_ticket_progress(doc, percent, source, confidence, now)
+# Cancelling the asyncio wrapper does not interrupt the executor thread, so
+# the watcher polls try_next with a bounded server wait and checks this flag
+# between polls; shutdown sets it and the thread exits within one wait.
+_WATCH_STOP = threading.Event()
+_WATCH_MAX_AWAIT_MS = 5000
+def _watch_ticket_changes() -> None:
+    try:
+        with tickets.watch(
+            pipeline=_CHANGE_STREAM_PIPELINE,
+            full_document="updateLookup",
+            max_await_time_ms=_WATCH_MAX_AWAIT_MS,
+        ) as stream:
+            while not _WATCH_STOP.is_set():
+                change = stream.try_next()
+                if change is None:
+                    continue
+                if not settings.PROGRESS_TRACKER_ENABLED:
+                    continue
+                if _is_progress_only_change(change):
+                    continue
+                doc = change.get("fullDocument")
+                if not doc:
+                    continue
+                try:
+                    _process_changed_ticket(doc)
+                except Exception as exc:
+                    LOGGER.warning("Auto progress change handling failed for %s: %s", doc.get("_id"), exc)
+    except PyMongoError as exc:
+        LOGGER.warning("Ticket change stream unavailable, using periodic passes only: %s", exc)
+async def _worker_loop() -> None:
+    poll_interval = max(int(settings.PROGRESS_TRACKER_INTERVAL_SECONDS), 15)
+    _WATCH_STOP.clear()
+    watch_task = asyncio.create_task(asyncio.to_thread(_watch_ticket_changes))
+    try:
+        while True:
+            try:
+                if settings.PROGRESS_TRACKER_ENABLED:
+                    await asyncio.to_thread(run_auto_progress_pass)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                LOGGER.warning("Auto progress tracker loop failed: %s", exc)
+            interval = poll_interval if watch_task.done() else max(poll_interval, _SAFETY_NET_INTERVAL_SECONDS)
+            await asyncio.sleep(interval)
+    finally:
+        # Cancellation almost always lands in the sleep above, not in the
+        # periodic pass, so the watcher shutdown must run on every exit path
+        # or the executor thread keeps polling the stream forever.
+        _WATCH_STOP.set()
+        watch_task.cancel()
+def start_auto_progress_tracker_worker() -> asyncio.Task | None:
     if not settings.PROGRESS_TRACKER_ENABLED:
         LOGGER.info("Auto progress tracker worker disabled by configuration.")
-        return
-    thread = threading.Thread(target=_worker_loop, daemon=True)
-    thread.start()
+        return None
+    return asyncio.create_task(_worker_loop())
@@ -1,14 +1,36 @@
-import base64
+import binascii
+import hashlib
 import os
-from datetime import datetime
 from uuid import uuid4
 from app.config.settings import settings
+_DECODE_CHUNK_CHARS = 64 * 1024
+os.makedirs(settings.IMAGE_DIR, exist_ok=True)
 def save_image(image_base64):
-    if not os.path.exists(settings.IMAGE_DIR):
-        os.makedirs(settings.IMAGE_DIR)
-    image_bytes = base64.b64decode(image_base64)
-    filename = f"{datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')}_{uuid4().hex[:8]}.jpg"
-    path = os.path.join(settings.IMAGE_DIR, filename)
-    with open(path, "wb") as f:
-        f.write(image_bytes)
+    if isinstance(image_base64, str):
+        image_base64 = image_base64.encode("ascii")
+    # base64.b64decode silently discarded embedded newlines/whitespace;
+    # drop them up front so the fixed-size chunks stay aligned to 4-char
+    # base64 quanta.
+    image_base64 = image_base64.translate(None, b" \t\r\n")
+    hasher = hashlib.blake2b(digest_size=16)
+    tmp_path = os.path.join(settings.IMAGE_DIR, f".{uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            for start in range(0, len(image_base64), _DECODE_CHUNK_CHARS):
+                chunk = binascii.a2b_base64(image_base64[start:start + _DECODE_CHUNK_CHARS])
+                hasher.update(chunk)
+                f.write(chunk)
+    except BaseException:
+        # Malformed payloads surface to the caller as before, but the
+        # partially written temp file must not be left behind.
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    path = os.path.join(settings.IMAGE_DIR, f"{hasher.hexdigest()}.jpg")
+    if os.path.exists(path):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, path)
     return path
@@ -1,8 +1,10 @@
 from __future__ import annotations
+import asyncio
 import logging
-import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, time as time_value, timedelta, timezone
+from pymongo import UpdateOne
 from app.config.settings import settings
 from app.database import tickets, users
 from app.roles import normalize_official_role
@@ -25,9 +27,10 @@ def _parse_dt(value):
     except ValueError:
         return None
     return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
-def _resolve_field_inspector_user(field_inspector_id: str | None):
-    if not field_inspector_id:
-        return None
+_INSPECTOR_CACHE_TTL_SECONDS = 60
+_INSPECTOR_CACHE_MAX_ENTRIES = 2048
+_inspector_cache: dict[str, tuple[float, dict | None]] = {}
+def _fetch_field_inspector_user(field_inspector_id: str):
     doc = None
     try:
         doc = users.find_one({"_id": to_object_id(field_inspector_id)})
@@ -40,10 +43,34 @@ def _resolve_field_inspector_user(field_inspector_id: str | None):
     if normalize_official_role(doc.get("officialRole")) != "field_inspector":
         return None
     return doc
-def _collect_recipient_inspectors(ticket_doc: dict) -> list[dict]:
-    assigned = _resolve_field_inspector_user(ticket_doc.get("fieldInspectorId"))
-    if assigned and assigned.get("email"):
-        return [assigned]
+def _resolve_field_inspector_user(field_inspector_id: str | None):
+    if not field_inspector_id:
+        return None
+    key = str(field_inspector_id)
+    entry = _inspector_cache.get(key)
+    if entry and time.monotonic() - entry[0] <= _INSPECTOR_CACHE_TTL_SECONDS:
+        return entry[1]
+    doc = _fetch_field_inspector_user(key)
+    if len(_inspector_cache) >= _INSPECTOR_CACHE_MAX_ENTRIES:
+        _inspector_cache.clear()
+    _inspector_cache[key] = (time.monotonic(), doc)
+    return doc
+_REMINDER_MAX_CONCURRENT_SENDS = 20
+def _send_reminder_email(job: tuple) -> bool:
+    ticket_obj_id, to_email, inspector_name, ticket_id, ticket_title, today_key = job
+    try:
+        send_field_inspector_reminder_email(
+            to_email=to_email,
+            inspector_name=inspector_name,
+            ticket_id=ticket_id,
+            ticket_title=ticket_title,
+            due_date=today_key,
+        )
+        return True
+    except Exception as exc:
+        LOGGER.warning("Inspector reminder email failed for %s ticket=%s: %s", to_email, ticket_id, exc)
+        return False
+def _list_fallback_inspectors() -> list[dict]:
     return list(
         users.find(
             {
@@ -61,7 +88,12 @@ def run_inspector_reminder_pass():
         return
     today_ist = now_ist.date()
     today_key = today_ist.isoformat()
-    cursor = tickets.find({"status": "in_progress"})
+    cursor = tickets.find(
+        {"status": "in_progress"},
+        {"lastInspectorUpdateAt": 1, "inspectorReminderSentForDate": 1, "fieldInspectorId": 1, "title": 1},
+    ).batch_size(500)
+    fallback_inspectors: list[dict] | None = None
+    send_jobs: list[tuple] = []
     for ticket_doc in cursor:
         last_update = _parse_dt(ticket_doc.get("lastInspectorUpdateAt"))
         updated_today = bool(last_update and last_update.astimezone(IST).date() == today_ist)
@@ -69,45 +101,50 @@ def run_inspector_reminder_pass():
             continue
         if (ticket_doc.get("inspectorReminderSentForDate") or "").strip() == today_key:
             continue
-        recipients = _collect_recipient_inspectors(ticket_doc)
+        assigned = _resolve_field_inspector_user(ticket_doc.get("fieldInspectorId"))
+        if assigned and assigned.get("email"):
+            recipients = [assigned]
+        else:
+            if fallback_inspectors is None:
+                fallback_inspectors = _list_fallback_inspectors()
+            recipients = fallback_inspectors
         if not recipients:
             continue
         ticket_id = str(ticket_doc.get("_id"))
         ticket_title = ticket_doc.get("title") or "Untitled ticket"
-        sent_any = False
         for inspector in recipients:
             to_email = (inspector.get("email") or "").strip()
             if not to_email:
                 continue
             inspector_name = inspector.get("name") or "Field Inspector"
-            try:
-                send_field_inspector_reminder_email(
-                    to_email=to_email,
-                    inspector_name=inspector_name,
-                    ticket_id=ticket_id,
-                    ticket_title=ticket_title,
-                    due_date=today_key,
-                )
-                sent_any = True
-            except Exception as exc:
-                LOGGER.warning("Inspector reminder email failed for %s ticket=%s: %s", to_email, ticket_id, exc)
-        if sent_any:
-            tickets.update_one(
-                {"_id": ticket_doc.get("_id")},
-                {"$set": {"inspectorReminderSentForDate": today_key}},
-            )
-def _worker_loop():
+            send_jobs.append((ticket_doc.get("_id"), to_email, inspector_name, ticket_id, ticket_title, today_key))
+    if not send_jobs:
+        return
+    max_workers = min(_REMINDER_MAX_CONCURRENT_SENDS, len(send_jobs))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(_send_reminder_email, send_jobs))
+    sent_ticket_ids = {job[0] for job, ok in zip(send_jobs, results) if ok}
+    if sent_ticket_ids:
+        tickets.bulk_write(
+            [
+                UpdateOne({"_id": ticket_obj_id}, {"$set": {"inspectorReminderSentForDate": today_key}})
+                for ticket_obj_id in sent_ticket_ids
+            ],
+            ordered=False,
+        )
+async def _worker_loop():
     interval = max(int(settings.INSPECTOR_REMINDER_INTERVAL_SECONDS), 60)
     while True:
         try:
             if settings.INSPECTOR_REMINDER_ENABLED:
-                run_inspector_reminder_pass()
+                await asyncio.to_thread(run_inspector_reminder_pass)
+        except asyncio.CancelledError:
+            raise
         except Exception as exc:
             LOGGER.warning("Field inspector reminder loop failed: %s", exc)
-        time.sleep(interval)
-def start_inspector_reminder_worker():
+        await asyncio.sleep(interval)
+def start_inspector_reminder_worker() -> asyncio.Task | None:
     if not settings.INSPECTOR_REMINDER_ENABLED:
         LOGGER.info("Field inspector reminder worker disabled by configuration.")
-        return
-    thread = threading.Thread(target=_worker_loop, daemon=True)
-    thread.start()
+        return None
+    return asyncio.create_task(_worker_loop())
@@ -1,11 +1,13 @@
 import base64
 import json
+import re
 from urllib import request, parse, error
 from app.config.settings import settings
+_NON_PHONE_CHARS_RE = re.compile(r"[^0-9+]+")
 def _normalize_phone(value: str) -> str:
     if not value:
         return ""
-    cleaned = "".join(ch for ch in value if ch.isdigit() or ch == "+")
+    cleaned = _NON_PHONE_CHARS_RE.sub("", value)
     if cleaned.startswith("+"):
         return cleaned
     if cleaned.startswith("0"):
@@ -1,10 +1,12 @@
 from __future__ import annotations
-import hashlib
 import hmac
 import logging
-import secrets
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
+from pymongo import ReturnDocument
 from app.config.settings import settings
 from app.database import otp_challenges
 from app.services.email_service import send_otp_email
@@ -25,12 +27,22 @@ class OtpChallengeInfo:
     masked_phone: str | None = None
 def _utcnow() -> datetime:
     return datetime.utcnow()
-def _otp_hash(otp: str) -> str:
-    key = settings.SECRET_KEY.encode("utf-8")
-    payload = otp.encode("utf-8")
-    return hmac.new(key, payload, hashlib.sha256).hexdigest()
-def _generate_otp() -> str:
-    return f"{secrets.randbelow(1_000_000):06d}"
+_HMAC_BASE = hmac.new(settings.SECRET_KEY.encode("utf-8"), None, "sha256")
+LOGGER.info("OTP HMAC backend: %s", type(_HMAC_BASE).__module__)
+def reset_hmac_base() -> None:
+    global _HMAC_BASE
+    _HMAC_BASE = hmac.new(settings.SECRET_KEY.encode("utf-8"), None, "sha256")
+def _otp_hash(otp: bytes) -> str:
+    ctx = _HMAC_BASE.copy()
+    ctx.update(otp)
+    return ctx.hexdigest()
+_URANDOM = os.urandom
+_OTP_SAMPLE_MAX = 2**32 - (2**32 % 1_000_000)
+def _generate_otp() -> bytes:
+    while True:
+        sample = int.from_bytes(_URANDOM(4), "little")
+        if sample < _OTP_SAMPLE_MAX:
+            return b"%06d" % (sample % 1_000_000)
 def _mask_email(value: str | None) -> str | None:
     if not value:
         return None
@@ -42,11 +54,12 @@ def _mask_email(value: str | None) -> str | None:
         return f"***@{domain}"
     prefix = local[:2]
     return f"{prefix}{'*' * max(1, len(local) - len(prefix))}@{domain}"
+_NON_DIGITS_RE = re.compile(r"\D+")
 def _mask_phone(value: str | None) -> str | None:
     if not value:
         return None
     phone = value.strip()
-    digits = "".join(ch for ch in phone if ch.isdigit())
+    digits = _NON_DIGITS_RE.sub("", phone)
     if len(digits) < 4:
         return None
     suffix = digits[-4:]
@@ -64,69 +77,83 @@ def _purpose_label(purpose: str) -> str:
     if purpose == PURPOSE_DISABLE_2FA:
         return "disabling 2FA"
     return "verification"
-def _assert_resend_allowed(user_id: str, purpose: str) -> None:
-    now = _utcnow()
-    existing = otp_challenges.find_one(
-        {"userId": user_id, "purpose": purpose, "used": False, "expiresAt": {"$gte": now}},
-        sort=[("createdAt", -1)],
-    )
-    if not existing:
+def _assert_resend_allowed(user_id: str, purpose: str, now: datetime) -> None:
+    window_seconds = max(0, int(settings.OTP_MIN_RESEND_SECONDS))
+    if not window_seconds:
         return
-    created_at = existing.get("createdAt")
-    if isinstance(created_at, datetime):
-        age_seconds = (now - created_at).total_seconds()
-        if age_seconds < settings.OTP_MIN_RESEND_SECONDS:
-            raise OtpError("OTP recently sent. Please wait a moment and try again.")
+    recent = otp_challenges.find_one(
+        {
+            "userId": user_id,
+            "purpose": purpose,
+            "used": False,
+            "expiresAt": {"$gte": now},
+            "createdAt": {"$gt": now - timedelta(seconds=window_seconds)},
+        },
+        {"_id": 1},
+    )
+    if recent:
+        raise OtpError("OTP recently sent. Please wait a moment and try again.")
+_OTP_DELIVERY_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="otp-deliver")
+def _deliver_otp_email(email: str, otp_value: str, purpose: str) -> tuple[bool, dict]:
+    try:
+        send_otp_email(
+            to_email=email,
+            otp=otp_value,
+            context=_purpose_label(purpose),
+            expires_minutes=settings.OTP_EXPIRE_MINUTES,
+        )
+        return True, {"ok": True, "to": email}
+    except Exception as exc:
+        LOGGER.warning("OTP email delivery failed for %s: %s", email, exc)
+        return False, {"ok": False, "to": email, "error": str(exc)}
+def _deliver_otp_sms(phone: str, otp_value: str) -> tuple[bool, dict]:
+    ok, err = send_sms(phone, f"SafeLive code: {otp_value}. Expires in {settings.OTP_EXPIRE_MINUTES} minutes.")
+    if ok:
+        return True, {"ok": True, "to": phone}
+    LOGGER.warning("OTP SMS delivery failed for %s: %s", phone, err)
+    return False, {"ok": False, "to": phone, "error": err or "unknown error"}
 def create_and_send_otp(user_doc: dict, purpose: str) -> OtpChallengeInfo:
     user_id = str(user_doc.get("_id") or "").strip()
     if not user_id:
         raise OtpError("Unable to create OTP challenge: missing user id")
-    _assert_resend_allowed(user_id=user_id, purpose=purpose)
     now = _utcnow()
-    otp_value = _generate_otp()
+    _assert_resend_allowed(user_id=user_id, purpose=purpose, now=now)
+    otp_bytes = _generate_otp()
+    otp_value = otp_bytes.decode("ascii")
     expires_at = now + timedelta(minutes=max(1, settings.OTP_EXPIRE_MINUTES))
-    otp_challenges.update_many(
-        {"userId": user_id, "purpose": purpose, "used": False},
-        {"$set": {"used": True, "invalidatedAt": now}},
-    )
-    insert_result = otp_challenges.insert_one(
+    record = otp_challenges.find_one_and_update(
+        {"userId": user_id, "purpose": purpose},
         {
-            "userId": user_id,
-            "purpose": purpose,
-            "otpHash": _otp_hash(otp_value),
-            "attempts": 0,
-            "used": False,
-            "createdAt": now,
-            "expiresAt": expires_at,
-        }
+            "$set": {
+                "otpHash": _otp_hash(otp_bytes),
+                "attempts": 0,
+                "used": False,
+                "createdAt": now,
+                "expiresAt": expires_at,
+            },
+            "$setOnInsert": {"firstIssuedAt": now},
+        },
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+        projection={"_id": 1},
     )
+    challenge_id = record["_id"]
     email = (user_doc.get("email") or "").strip()
     phone = (user_doc.get("phone") or "").strip()
     channels_sent: list[str] = []
     delivery: dict = {}
+    futures = {}
     if email:
-        try:
-            send_otp_email(
-                to_email=email,
-                otp=otp_value,
-                context=_purpose_label(purpose),
-                expires_minutes=settings.OTP_EXPIRE_MINUTES,
-            )
-            channels_sent.append("email")
-            delivery["email"] = {"ok": True, "to": email}
-        except Exception as exc:
-            delivery["email"] = {"ok": False, "to": email, "error": str(exc)}
-            LOGGER.warning("OTP email delivery failed for %s: %s", email, exc)
+        futures["email"] = _OTP_DELIVERY_POOL.submit(_deliver_otp_email, email, otp_value, purpose)
     if phone:
-        ok, err = send_sms(phone, f"SafeLive code: {otp_value}. Expires in {settings.OTP_EXPIRE_MINUTES} minutes.")
+        futures["sms"] = _OTP_DELIVERY_POOL.submit(_deliver_otp_sms, phone, otp_value)
+    for channel, future in futures.items():
+        ok, result = future.result()
+        delivery[channel] = result
         if ok:
-            channels_sent.append("sms")
-            delivery["sms"] = {"ok": True, "to": phone}
-        else:
-            delivery["sms"] = {"ok": False, "to": phone, "error": err or "unknown error"}
-            LOGGER.warning("OTP SMS delivery failed for %s: %s", phone, err)
+            channels_sent.append(channel)
     otp_challenges.update_one(
-        {"_id": insert_result.inserted_id},
+        {"_id": challenge_id},
         {
             "$set": {
                 "delivery": delivery,
@@ -138,7 +165,7 @@ def create_and_send_otp(user_doc: dict, purpose: str) -> OtpChallengeInfo:
     if not channels_sent:
         raise OtpError("Unable to deliver OTP to email or phone. Check email/Twilio configuration.")
     return OtpChallengeInfo(
-        challenge_id=str(insert_result.inserted_id),
+        challenge_id=str(challenge_id),
         channels_sent=channels_sent,
         masked_email=_mask_email(email),
         masked_phone=_mask_phone(phone),
@@ -154,7 +181,10 @@ def verify_otp(challenge_id: str, otp: str, *, purpose: str | None = None, user_
     except Exception:
         raise OtpError("Invalid challengeId")
     now = _utcnow()
-    record = otp_challenges.find_one({"_id": obj_id})
+    record = otp_challenges.find_one(
+        {"_id": obj_id},
+        {"purpose": 1, "userId": 1, "used": 1, "expiresAt": 1, "attempts": 1, "otpHash": 1},
+    )
     if not record:
         raise OtpError("OTP challenge not found")
     if purpose and record.get("purpose") != purpose:
@@ -170,7 +200,7 @@ def verify_otp(challenge_id: str, otp: str, *, purpose: str | None = None, user_
     if attempts >= settings.OTP_MAX_ATTEMPTS:
         raise OtpError("Too many attempts. Please request a new OTP.")
     expected_hash = (record.get("otpHash") or "").strip()
-    provided_hash = _otp_hash(otp_value)
+    provided_hash = _otp_hash(otp_value.encode("utf-8"))
     if not expected_hash or not hmac.compare_digest(expected_hash, provided_hash):
         otp_challenges.update_one({"_id": obj_id}, {"$inc": {"attempts": 1}})
         raise OtpError("Invalid OTP")
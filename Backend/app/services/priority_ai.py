@@ -1,6 +1,7 @@
 from __future__ import annotations
 import base64
 import csv
+import hashlib
 import json
 import logging
 import os
@@ -11,6 +12,7 @@ from io import BytesIO
 from pathlib import Path
 from app.config.settings import settings
 from app.database import incidents
+from app.services.zero_shot_backbone import load_zero_shot_pipeline, prime_pipeline_shapes, resolve_hf_device
 LOGGER = logging.getLogger(__name__)
 PRIORITY_LEVELS = ("low", "medium", "high")
 DEFAULT_VISION_MODEL_ID = "Qwen/Qwen2.5-VL-3B-Instruct"
@@ -25,16 +27,28 @@ RISK_ALIASES = {
     "medium": {"medium", "moderate", "normal", "average"},
     "high": {"high", "major", "urgent", "emergency", "critical", "extreme"},
 }
+PRIORITY_CANDIDATE_LABELS = list(PRIORITY_LABELS.values())
+PRIORITY_HYPOTHESIS_TEMPLATE = "This incident is {}."
+_ALIAS_TO_PRIORITY = {
+    alias: priority for priority, aliases in RISK_ALIASES.items() for alias in aliases | {priority}
+}
+_RISK_ALIAS_RES = {
+    priority: re.compile(
+        "|".join(sorted(map(re.escape, aliases | {priority}), key=len, reverse=True))
+    )
+    for priority, aliases in RISK_ALIASES.items()
+}
+_DATA_URL_PREFIX_RE = re.compile(r"^data:image/[^;]+;base64,", re.IGNORECASE)
 def _clean(value: str | None) -> str:
     return (value or "").strip().lower()
 def _normalize_distribution(raw: dict[str, float] | None) -> dict[str, float] | None:
     if not raw:
         return None
-    scores = {priority: max(float(raw.get(priority, 0.0)), 0.0) for priority in PRIORITY_LEVELS}
-    total = sum(scores.values())
+    values = [max(float(raw.get(priority, 0.0)), 0.0) for priority in PRIORITY_LEVELS]
+    total = sum(values)
     if total <= 0:
         return None
-    return {priority: scores[priority] / total for priority in PRIORITY_LEVELS}
+    return {priority: value / total for priority, value in zip(PRIORITY_LEVELS, values)}
 def _normalize_confidence(value: object) -> float | None:
     try:
         if value is None:
@@ -49,11 +63,11 @@ def _normalize_risk(value: str | None) -> str | None:
     label = _clean(value)
     if not label:
         return None
-    for priority, aliases in RISK_ALIASES.items():
-        if label == priority or label in aliases:
-            return priority
-    for priority, aliases in RISK_ALIASES.items():
-        if priority in label or any(alias in label for alias in aliases):
+    direct = _ALIAS_TO_PRIORITY.get(label)
+    if direct:
+        return direct
+    for priority, pattern in _RISK_ALIAS_RES.items():
+        if pattern.search(label):
             return priority
     return None
 def _build_priority_prompt(*, narrative: str, category: str | None) -> str:
@@ -84,15 +98,6 @@ high = active hazard, sewage overflow, severe obstruction, electrical danger, or
 Return only JSON with this schema:
 {{"risk":"low|medium|high","hazard":"string","reason":"string","confidence":0.0}}
 """.strip()
-def _resolve_hf_pipeline_device() -> tuple[int, str]:
-    """Resolve the device for HuggingFace pipeline."""
-    try:
-        import torch
-        if torch.cuda.is_available():
-            return 0, "cuda:0"
-    except Exception as exc:
-        LOGGER.debug("Torch CUDA detection failed, falling back to CPU: %s", exc)
-    return -1, "cpu"
 def _set_hf_env() -> None:
     """Set HuggingFace hub environment variables."""
     os.environ.setdefault("HF_HUB_DISABLE_TELEMETRY", "1")
@@ -121,7 +126,7 @@ def _decode_base64_image(image_payload: str | None):
     payload = (image_payload or "").strip()
     if not payload:
         return None
-    payload = re.sub(r"^data:image/[^;]+;base64,", "", payload, flags=re.IGNORECASE)
+    payload = _DATA_URL_PREFIX_RE.sub("", payload)
     try:
         raw = base64.b64decode(payload, validate=True)
     except Exception:
@@ -132,14 +137,6 @@ def _decode_base64_image(image_payload: str | None):
     except Exception as exc:
         LOGGER.warning("Unable to decode incident image payload: %s", exc)
         return None
-def _resolve_hf_device() -> int:
-    try:
-        import torch
-        if torch.cuda.is_available():
-            return 0
-    except Exception:
-        pass
-    return -1
 @dataclass(frozen=True)
 class PriorityPrediction:
     priority: str
@@ -172,12 +169,8 @@ class VisionPriorityModel:
                 except ImportError as e1:
                     LOGGER.debug("AutoModel import failed: %s, trying pipeline...", e1)
                     try:
-                        from transformers import pipeline
-                        _, device_name = _resolve_hf_pipeline_device()
-                        self._pipeline = pipeline(
-                            "zero-shot-classification",
-                            model=DEFAULT_TEXT_MODEL_ID,
-                        )
+                        device_id, device_name = resolve_hf_device()
+                        self._pipeline = load_zero_shot_pipeline(DEFAULT_TEXT_MODEL_ID, device_id)
                         LOGGER.info("Loaded text classification model: %s (device=%s)", DEFAULT_TEXT_MODEL_ID, device_name)
                         return
                     except Exception as e2:
@@ -257,12 +250,16 @@ class VisionPriorityModel:
         except Exception as exc:
             LOGGER.warning("Vision priority inference failed: %s", exc)
             return None
+_SCORE_CACHE_MAX_ENTRIES = 8192
+def _score_cache_key(text: str, model_id: str) -> bytes:
+    return hashlib.sha256(f"{text}|{model_id}".encode("utf-8")).digest()
 class TextPriorityModel:
     def __init__(self):
         self._pipeline = None
         self._load_attempted = False
         self._lock = threading.Lock()
         self._label_to_priority = {label.lower(): priority for priority, label in PRIORITY_LABELS.items()}
+        self._score_cache: dict[bytes, dict[str, float] | None] = {}
     def _ensure_loaded(self) -> None:
         if self._load_attempted:
             return
@@ -275,8 +272,7 @@ class TextPriorityModel:
             _set_hf_env()
             model_id = (settings.PRIORITY_AI_TEXT_MODEL or DEFAULT_TEXT_MODEL_ID).strip() or DEFAULT_TEXT_MODEL_ID
             try:
-                from transformers import pipeline
-                self._pipeline = pipeline("zero-shot-classification", model=model_id, device=_resolve_hf_device())
+                self._pipeline = load_zero_shot_pipeline(model_id, resolve_hf_device()[0])
                 LOGGER.info("Loaded priority text model: %s", model_id)
             except Exception as exc:
                 self._pipeline = None
@@ -285,11 +281,15 @@ class TextPriorityModel:
         self._ensure_loaded()
         if not self._pipeline:
             return None
+        cache_key = _score_cache_key(text or "", settings.PRIORITY_AI_TEXT_MODEL or DEFAULT_TEXT_MODEL_ID)
+        if cache_key in self._score_cache:
+            cached = self._score_cache[cache_key]
+            return dict(cached) if cached else None
         try:
             result = self._pipeline(
                 sequences=text or "municipal incident",
-                candidate_labels=list(PRIORITY_LABELS.values()),
-                hypothesis_template="This incident is {}.",
+                candidate_labels=PRIORITY_CANDIDATE_LABELS,
+                hypothesis_template=PRIORITY_HYPOTHESIS_TEMPLATE,
                 multi_label=False,
             )
         except Exception as exc:
@@ -302,7 +302,11 @@ class TextPriorityModel:
             mapped = self._label_to_priority.get(_clean(str(label)))
             if mapped in PRIORITY_LEVELS:
                 raw[mapped] = float(score)
-        return _normalize_distribution(raw)
+        normalized = _normalize_distribution(raw)
+        if len(self._score_cache) >= _SCORE_CACHE_MAX_ENTRIES:
+            self._score_cache.clear()
+        self._score_cache[cache_key] = dict(normalized) if normalized else None
+        return normalized
 class DatasetPriorityModel:
     def __init__(self):
         self._vectorizer = None
@@ -544,6 +548,15 @@ class PriorityClassifier:
                         except Exception:
                             continue
                 vision_scores = _normalize_distribution(parsed_scores)
+        if vision_scores:
+            top_priority = max(PRIORITY_LEVELS, key=lambda priority: vision_scores.get(priority, 0.0))
+            top_score = vision_scores.get(top_priority, 0.0)
+            if top_score >= float(settings.PRIORITY_AI_SHORT_CIRCUIT_CONFIDENCE):
+                return PriorityPrediction(
+                    priority=top_priority,
+                    confidence=round(max(0.0, min(1.0, top_score)), 4),
+                    source="vision_confident",
+                )
         text_scores = self._text_model.predict_scores(text)
         dataset_scores = self._dataset_model.predict_scores(text)
         combined, source_name = self._combine_scores(
@@ -589,6 +602,11 @@ def warmup_priority_model() -> PriorityPrediction:
         source="startup",
         location="N/A",
     )
+    prime_pipeline_shapes(
+        _classifier._text_model._pipeline,
+        PRIORITY_CANDIDATE_LABELS,
+        PRIORITY_HYPOTHESIS_TEMPLATE,
+    )
     LOGGER.info(
         "Incident priority model warmup completed. source=%s priority=%s confidence=%s",
         prediction.source,
@@ -1,10 +1,12 @@
 from __future__ import annotations
+import hashlib
 import logging
 import os
 import re
 import threading
 from dataclasses import dataclass
 from app.config.settings import settings
+from app.services.zero_shot_backbone import load_zero_shot_pipeline, prime_pipeline_shapes, resolve_hf_device
 LOGGER = logging.getLogger(__name__)
 PROGRESS_STEPS = tuple(range(5, 101, 5))
 MIN_ZERO_SHOT_CONFIDENCE = 0.2
@@ -13,60 +15,51 @@ PROGRESS_LABELS = {
     for step in PROGRESS_STEPS
 }
 LABEL_TO_PROGRESS = {value.lower(): key for key, value in PROGRESS_LABELS.items()}
+PROGRESS_CANDIDATE_LABELS = list(PROGRESS_LABELS.values())
+PROGRESS_HYPOTHESIS_TEMPLATE = "This update indicates {}."
 def _round_step(value: float) -> int:
     value = max(5.0, min(100.0, value))
     rounded = int(round(value / 5.0) * 5)
     return max(5, min(100, rounded))
-def _resolve_hf_pipeline_device() -> tuple[int, str]:
-    try:
-        import torch  
-        if torch.cuda.is_available():
-            return 0, "cuda:0"
-    except Exception as exc:
-        LOGGER.debug("Torch CUDA detection failed for progress model, falling back to CPU: %s", exc)
-    return -1, "cpu"
+_EXPLICIT_PERCENT_RE = re.compile(r"\b(\d{1,3})\s*%\b")
 def _extract_explicit_percent(text: str) -> int | None:
-    if not text:
+    if not text or "%" not in text:
         return None
-    match = re.search(r"\b(\d{1,3})\s*%\b", text)
+    match = _EXPLICIT_PERCENT_RE.search(text)
     if not match:
         return None
-    try:
-        value = float(match.group(1))
-    except Exception:
-        return None
-    value = max(0.0, min(100.0, value))
+    value = min(100, int(match.group(1)))
     if value <= 0:
         return 5
     return _round_step(value)
+def _marker_re(*phrases: str) -> re.Pattern[str]:
+    return re.compile("|".join(map(re.escape, phrases)))
+_INCOMPLETE_MARKERS_RE = _marker_re("not done", "not completed", "incomplete", "pending", "remaining")
+_COMPLETION_CLAIM_RE = _marker_re("all done", "job done", "completed all", "everything completed")
+_PROGRESS_MARKERS: tuple[tuple[re.Pattern[str], float], ...] = (
+    (_marker_re("verified completed", "all tasks closed", "handover complete"), 100.0),
+    (_marker_re("fully completed", "completed", "work done", "finished"), 95.0),
+    (_marker_re("almost done", "near completion", "final stage"), 85.0),
+    (_marker_re("halfway", "half done", "50 percent"), 50.0),
+    (_marker_re("work in progress", "ongoing", "currently working"), 40.0),
+    (_marker_re("materials arranged", "procurement complete"), 30.0),
+    (_marker_re("started", "initial", "site visit", "inspection done"), 15.0),
+)
+_DELAY_MARKERS_RE = _marker_re("delay", "blocked", "waiting", "pending approval")
 def _heuristic_progress(text: str) -> tuple[int, float]:
     blob = (text or "").strip().lower()
     if not blob:
         return 5, 0.4
     score = 5.0
-    has_incomplete_marker = any(
-        token in blob
-        for token in ("not done", "not completed", "incomplete", "pending", "remaining")
-    )
-    if not has_incomplete_marker and any(
-        token in blob for token in ("all done", "job done", "completed all", "everything completed")
-    ):
-        score = max(score, 95.0)
-    if any(token in blob for token in ("fully completed", "completed", "work done", "finished")):
-        score = max(score, 95.0)
-    if any(token in blob for token in ("verified completed", "all tasks closed", "handover complete")):
-        score = max(score, 100.0)
-    if any(token in blob for token in ("almost done", "near completion", "final stage")):
-        score = max(score, 85.0)
-    if any(token in blob for token in ("halfway", "half done", "50 percent")):
-        score = max(score, 50.0)
-    if any(token in blob for token in ("started", "initial", "site visit", "inspection done")):
-        score = max(score, 15.0)
-    if any(token in blob for token in ("materials arranged", "procurement complete")):
-        score = max(score, 30.0)
-    if any(token in blob for token in ("work in progress", "ongoing", "currently working")):
-        score = max(score, 40.0)
-    if any(token in blob for token in ("delay", "blocked", "waiting", "pending approval")):
+    if not _INCOMPLETE_MARKERS_RE.search(blob) and _COMPLETION_CLAIM_RE.search(blob):
+        score = 95.0
+    for pattern, value in _PROGRESS_MARKERS:
+        if value <= score:
+            break
+        if pattern.search(blob):
+            score = value
+            break
+    if _DELAY_MARKERS_RE.search(blob):
         score = min(score, 35.0)
     return _round_step(score), 0.55
 @dataclass(frozen=True)
@@ -74,11 +67,13 @@ class ProgressPrediction:
     percent: int
     confidence: float
     source: str
+_PREDICTION_CACHE_MAX_ENTRIES = 8192
 class _ProgressModel:
     def __init__(self):
         self._pipeline = None
         self._load_attempted = False
         self._load_lock = threading.Lock()
+        self._prediction_cache: dict[bytes, ProgressPrediction] = {}
     def _ensure_loaded(self):
         if self._load_attempted:
             return
@@ -98,14 +93,9 @@ class _ProgressModel:
                     os.environ["HF_HUB_OFFLINE"] = "1"
                 else:
                     os.environ.pop("HF_HUB_OFFLINE", None)
-                from transformers import pipeline
-                device_id, device_name = _resolve_hf_pipeline_device()
+                device_id, device_name = resolve_hf_device()
                 try:
-                    self._pipeline = pipeline(
-                        "zero-shot-classification",
-                        model=settings.PROGRESS_AI_MODEL,
-                        device=device_id,
-                    )
+                    self._pipeline = load_zero_shot_pipeline(settings.PROGRESS_AI_MODEL, device_id)
                     LOGGER.info(
                         "Ticket progress AI model loaded: %s (device=%s)",
                         settings.PROGRESS_AI_MODEL,
@@ -113,11 +103,7 @@ class _ProgressModel:
                     )
                 except Exception as device_error:
                     LOGGER.debug("Device placement failed for progress model: %s. Retrying without device...", device_error)
-                    self._pipeline = pipeline(
-                        "zero-shot-classification",
-                        model=settings.PROGRESS_AI_MODEL,
-                        device=-1,
-                    )
+                    self._pipeline = load_zero_shot_pipeline(settings.PROGRESS_AI_MODEL, -1)
                     LOGGER.info("Ticket progress AI model loaded on CPU: %s", settings.PROGRESS_AI_MODEL)
             except Exception as exc:
                 LOGGER.warning(
@@ -130,13 +116,20 @@ class _ProgressModel:
         explicit = _extract_explicit_percent(text)
         if explicit is not None:
             return ProgressPrediction(percent=explicit, confidence=0.98, source="explicit_percentage")
+        heuristic_value, _ = _heuristic_progress(text)
+        if heuristic_value >= 100:
+            return ProgressPrediction(percent=100, confidence=0.9, source="heuristic_confident")
         self._ensure_loaded()
         if self._pipeline:
+            cache_key = hashlib.sha256(f"{text or ''}|{settings.PROGRESS_AI_MODEL}".encode("utf-8")).digest()
+            cached = self._prediction_cache.get(cache_key)
+            if cached is not None:
+                return cached
             try:
                 result = self._pipeline(
                     sequences=text or "field work just started",
-                    candidate_labels=list(PROGRESS_LABELS.values()),
-                    hypothesis_template="This update indicates {}.",
+                    candidate_labels=PROGRESS_CANDIDATE_LABELS,
+                    hypothesis_template=PROGRESS_HYPOTHESIS_TEMPLATE,
                     multi_label=False,
                 )
                 labels = result.get("labels") or []
@@ -147,17 +140,22 @@ class _ProgressModel:
                         confidence = float(scores[0]) if scores else 0.6
                         confidence = round(max(0.0, min(1.0, confidence)), 4)
                         if confidence >= MIN_ZERO_SHOT_CONFIDENCE:
-                            return ProgressPrediction(
+                            prediction = ProgressPrediction(
                                 percent=mapped,
                                 confidence=confidence,
                                 source="zero_shot_pretrained",
                             )
-                        heuristic_value, heuristic_confidence = _heuristic_progress(text)
-                        return ProgressPrediction(
-                            percent=max(mapped, heuristic_value),
-                            confidence=round(max(confidence, heuristic_confidence), 4),
-                            source="hybrid_low_confidence",
-                        )
+                        else:
+                            heuristic_value, heuristic_confidence = _heuristic_progress(text)
+                            prediction = ProgressPrediction(
+                                percent=max(mapped, heuristic_value),
+                                confidence=round(max(confidence, heuristic_confidence), 4),
+                                source="hybrid_low_confidence",
+                            )
+                        if len(self._prediction_cache) >= _PREDICTION_CACHE_MAX_ENTRIES:
+                            self._prediction_cache.clear()
+                        self._prediction_cache[cache_key] = prediction
+                        return prediction
             except Exception as exc:
                 LOGGER.warning("Ticket progress inference failed, using heuristic fallback: %s", exc)
         value, confidence = _heuristic_progress(text)
@@ -167,6 +165,7 @@ def predict_ticket_progress(update_text: str) -> ProgressPrediction:
     return _progress_model.predict(update_text)
 def warmup_progress_model() -> ProgressPrediction:
     prediction = _progress_model.predict("Initial inspection completed and repair work started.")
+    prime_pipeline_shapes(_progress_model._pipeline, PROGRESS_CANDIDATE_LABELS, PROGRESS_HYPOTHESIS_TEMPLATE)
     LOGGER.info(
         "Ticket progress model warmup completed. source=%s percent=%s confidence=%s",
         prediction.source,
@@ -0,0 +1,71 @@
+from __future__ import annotations
+import logging
+import threading
+from functools import lru_cache
+from app.config.settings import settings
+LOGGER = logging.getLogger(__name__)
+_PIPELINE_CACHE: dict[tuple[str, int], object] = {}
+_LOAD_LOCK = threading.Lock()
+@lru_cache(maxsize=1)
+def resolve_hf_device() -> tuple[int, str]:
+    """Probe torch for CUDA once, shared by every HuggingFace consumer."""
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return 0, "cuda:0"
+    except Exception as exc:
+        LOGGER.debug("Torch CUDA detection failed, falling back to CPU: %s", exc)
+    return -1, "cpu"
+def _quantize_pipeline_model(pipe) -> None:
+    """Apply INT8 dynamic quantization to a CPU-bound HF pipeline in place."""
+    if not settings.AI_QUANTIZE_INT8:
+        return
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return
+        pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+        LOGGER.info("Applied INT8 dynamic quantization to %s", getattr(pipe.model.config, "name_or_path", "model"))
+    except Exception as exc:
+        LOGGER.debug("INT8 quantization skipped: %s", exc)
+_WARMUP_SEQ_LENS = (32, 128, 256)
+def prime_pipeline_shapes(pipe, candidate_labels, hypothesis_template: str) -> None:
+    """Run throwaway passes over the common serving sequence lengths.
+
+    The first inference at a new input shape pays kernel autotune cost;
+    covering the typical lengths during warmup keeps that spike off the
+    first real request.
+    """
+    if pipe is None:
+        return
+    for seq_len in _WARMUP_SEQ_LENS:
+        try:
+            pipe(
+                sequences="warmup " * seq_len,
+                candidate_labels=candidate_labels,
+                hypothesis_template=hypothesis_template,
+                multi_label=False,
+            )
+        except Exception as exc:
+            LOGGER.debug("Shape warmup pass failed (seq_len=%s): %s", seq_len, exc)
+            return
+def load_zero_shot_pipeline(model_id: str, device: int):
+    """Return a shared zero-shot-classification pipeline for (model_id, device).
+
+    The priority and progress classifiers can point at the same NLI backbone;
+    loading through this cache keeps one copy of the weights in memory instead
+    of one per consumer. The double-checked lock prevents concurrent warmups
+    from loading the same model twice.
+    """
+    key = (model_id, device)
+    pipe = _PIPELINE_CACHE.get(key)
+    if pipe is not None:
+        return pipe
+    with _LOAD_LOCK:
+        pipe = _PIPELINE_CACHE.get(key)
+        if pipe is None:
+            from transformers import pipeline
+            pipe = pipeline("zero-shot-classification", model=model_id, device=device)
+            _quantize_pipeline_model(pipe)
+            _PIPELINE_CACHE[key] = pipe
+    return pipe
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from bson import ObjectId
 def serialize_doc(doc: dict | None) -> dict | None:
     if doc is None:
@@ -8,5 +9,6 @@ def serialize_doc(doc: dict | None) -> dict | None:
     return data
 def serialize_list(docs: list[dict]) -> list[dict]:
     return [serialize_doc(doc) for doc in docs]
+@lru_cache(maxsize=8192)
 def to_object_id(value: str) -> ObjectId:
     return ObjectId(value)
@@ -0,0 +1,66 @@
+"""Command line entry point for reseeding the SafeLive development database.
+
+Usage:
+    python reseed_data.py --officials 4 --citizens 6 --incidents 40
+
+Defaults below are hard-coded copies of the seed_data constants so that
+--help and argument errors never pay the seed_data import (pymongo, bcrypt).
+seed_data is imported only once a run is actually requested.
+"""
+import argparse
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Reseed the SafeLive database with fixture data.")
+    parser.add_argument("--mongo-url", default="mongodb://localhost:27017/", help="MongoDB connection URL.")
+    parser.add_argument("--db-name", default="safelive", help="Target database name.")
+    parser.add_argument("--officials", type=int, default=4, help="Number of seed official accounts.")
+    parser.add_argument("--citizens", type=int, default=6, help="Number of seed citizen accounts.")
+    parser.add_argument("--incidents", type=int, default=40, help="Number of seed incidents (with tickets).")
+    parser.add_argument("--official-password", default=None, help="Password for seed officials (random if omitted).")
+    parser.add_argument("--citizen-password", default=None, help="Password for seed citizens (random if omitted).")
+    parser.add_argument("--country-code", default="+91", help="Country code prefix for seed phone numbers.")
+    parser.add_argument("--email-domain", default="safelive.dev", help="Domain for seed account emails.")
+    parser.add_argument("--random-seed", type=int, default=None, help="Fix the RNG seed for reproducible data.")
+    parser.add_argument(
+        "--reset-incidents",
+        action="store_true",
+        help="Delete previously seeded incidents/tickets before reseeding.",
+    )
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+
+    from seed_data import SeedConfig, seed_database
+
+    config = SeedConfig(
+        mongo_url=args.mongo_url,
+        db_name=args.db_name,
+        official_count=args.officials,
+        citizen_count=args.citizens,
+        incident_count=args.incidents,
+        official_password=args.official_password,
+        citizen_password=args.citizen_password,
+        country_code=args.country_code,
+        email_domain=args.email_domain,
+        random_seed=args.random_seed,
+        reset_incidents=args.reset_incidents,
+    )
+    result = seed_database(config)
+
+    print("Seeding complete.")
+    print(f"  Users seeded:     {result.seeded_users} (total in db: {result.users_total})")
+    print(f"  Incidents seeded: {result.seeded_incidents} (total in db: {result.incidents_total})")
+    print(f"  Tickets seeded:   {result.seeded_tickets} (total in db: {result.tickets_total})")
+    for role, password in result.generated_passwords.items():
+        print(f"  {role} password:  {password}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except Exception as error:
+        print(f"Seeding failed: {error}")
+        raise
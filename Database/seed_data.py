@@ -0,0 +1,587 @@
+"""Deterministic development seed data for the SafeLive database.
+
+Creates a pool of official and citizen accounts plus a spread of incidents
+with matching tickets. Every seeded document carries a seedTag/seedKey so
+repeated runs upsert in place instead of duplicating data.
+
+Use reseed_data.py for the command line interface.
+"""
+from __future__ import annotations
+
+import atexit
+import base64
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from dataclasses import dataclass, field
+from operator import itemgetter
+from types import MappingProxyType
+from datetime import datetime, timedelta, timezone
+
+# bcrypt, numpy, bson and pymongo are imported inside the functions that use
+# them: importing this module for its constants/dataclasses (as reseed_data
+# and ad-hoc scripts do) then costs stdlib imports only.
+
+DEFAULT_MONGO_URL = "mongodb://localhost:27017/"
+DEFAULT_DB_NAME = "safelive"
+DEFAULT_COUNTRY_CODE = "+91"
+DEFAULT_EMAIL_DOMAIN = "safelive.dev"
+
+SEED_TAG = "safelive-seed-v1"
+MAX_INCIDENT_COUNT = 250
+
+OFFICIAL_ROLES = ("inspector", "supervisor", "department", "worker")
+
+# Frozen below: the build loop reuses these per document, so a stray
+# mutation would silently corrupt every later incident.
+_INCIDENT_TEMPLATE_DATA = [
+    {
+        "title": "Pothole near main crossing",
+        "description": "Large pothole causing two-wheelers to swerve into oncoming traffic.",
+        "category": "pothole",
+        "priority": "high",
+        "location": "MG Road crossing",
+        "latitude": 23.2599,
+        "longitude": 77.4126,
+    },
+    {
+        "title": "Waterlogging after overnight rain",
+        "description": "Knee-deep water near the bus stop, drain overflow blocking the footpath.",
+        "category": "waterlogging",
+        "priority": "medium",
+        "location": "Station Road bus stop",
+        "latitude": 23.2681,
+        "longitude": 77.4034,
+    },
+    {
+        "title": "Garbage pileup beside market",
+        "description": "Collection skipped for three days, waste spreading onto the service lane.",
+        "category": "garbage",
+        "priority": "medium",
+        "location": "New Market service lane",
+        "latitude": 23.2332,
+        "longitude": 77.4029,
+    },
+    {
+        "title": "Streetlight out on school stretch",
+        "description": "Four consecutive poles dark, stretch unsafe after evening classes.",
+        "category": "streetlight",
+        "priority": "medium",
+        "location": "Shivaji Nagar school road",
+        "latitude": 23.2415,
+        "longitude": 77.4241,
+    },
+    {
+        "title": "Water pipeline leak near society gate",
+        "description": "Clean water leaking since morning, pressure dropped in nearby blocks.",
+        "category": "water_leakage",
+        "priority": "high",
+        "location": "Arera Colony gate 3",
+        "latitude": 23.2156,
+        "longitude": 77.4348,
+    },
+    {
+        "title": "Sparking wire above vegetable stalls",
+        "description": "Low-hanging service wire sparking intermittently over a busy stall row.",
+        "category": "electricity",
+        "priority": "high",
+        "location": "Itwara vegetable market",
+        "latitude": 23.2547,
+        "longitude": 77.3914,
+    },
+    {
+        "title": "Blocked drain backing up sewage",
+        "description": "Open drain clogged with construction debris, overflow entering shops.",
+        "category": "drainage",
+        "priority": "medium",
+        "location": "Hamidia Road shop line",
+        "latitude": 23.2625,
+        "longitude": 77.3966,
+    },
+    {
+        "title": "Broken divider at accident-prone turn",
+        "description": "Concrete divider shattered at the blind turn, debris on the carriageway.",
+        "category": "safety",
+        "priority": "high",
+        "location": "VIP Road turn near lake",
+        "latitude": 23.2503,
+        "longitude": 77.3850,
+    },
+]
+
+INCIDENT_TEMPLATES = tuple(MappingProxyType(template) for template in _INCIDENT_TEMPLATE_DATA)
+
+
+@dataclass
+class SeedConfig:
+    mongo_url: str = DEFAULT_MONGO_URL
+    db_name: str = DEFAULT_DB_NAME
+    official_count: int = 4
+    citizen_count: int = 6
+    incident_count: int = 40
+    official_password: str | None = None
+    citizen_password: str | None = None
+    country_code: str = DEFAULT_COUNTRY_CODE
+    email_domain: str = DEFAULT_EMAIL_DOMAIN
+    random_seed: int | None = None
+    reset_incidents: bool = False
+
+
+@dataclass(frozen=True)
+class UserRef:
+    user_id: str
+    name: str
+    email: str
+    phone: str
+    user_type: str
+
+
+@dataclass
+class SeedResult:
+    seeded_users: int
+    seeded_incidents: int
+    seeded_tickets: int
+    users_total: int
+    incidents_total: int
+    tickets_total: int
+    generated_passwords: dict = field(default_factory=dict)
+
+
+def hash_password(password: str) -> str:
+    import bcrypt
+
+    salt = bcrypt.gensalt()
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+_BULK_WRITE_BATCH_SIZE = 500
+
+
+def _chunked(operations: list, size: int = _BULK_WRITE_BATCH_SIZE):
+    """Yield operations in fixed-size batches.
+
+    Keeps each bulk_write message bounded so a large --incidents run never
+    builds one oversized OP_MSG or holds every operation's result in memory
+    at once.
+    """
+    for start in range(0, len(operations), size):
+        yield operations[start : start + size]
+
+
+_PASSWORD_HASH_CACHE: dict[str, str] = {}
+
+
+def _hash_passwords(passwords: list[str]) -> dict[str, str]:
+    """Hash each distinct password once, reusing results across calls.
+
+    Repeat runs (and runs where both roles share a password) skip bcrypt
+    entirely for anything already hashed in this process.
+    """
+    pending = [p for p in dict.fromkeys(passwords) if p not in _PASSWORD_HASH_CACHE]
+    if pending:
+        # bcrypt is deliberately slow (~100ms+ per hash); run distinct
+        # passwords through worker processes in parallel.
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            for password, hashed in zip(pending, pool.map(hash_password, pending)):
+                _PASSWORD_HASH_CACHE[password] = hashed
+    return {password: _PASSWORD_HASH_CACHE[password] for password in passwords}
+
+
+_SLUG_KEEP = "abcdefghijklmnopqrstuvwxyz0123456789"
+_SLUG_TABLE = str.maketrans({char: "-" for char in map(chr, range(128)) if char not in _SLUG_KEEP})
+
+
+def _slugify(value: str) -> str:
+    # Seed names are ASCII; a translate table plus split/join does the same
+    # work as the old regex substitution (including collapsing separator
+    # runs) without the regex engine.
+    return "-".join(filter(None, value.lower().translate(_SLUG_TABLE).split("-")))
+
+
+_ISO_UTC_FMT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _iso_utc(value: datetime) -> str:
+    return value.astimezone(timezone.utc).replace(microsecond=0).strftime(_ISO_UTC_FMT)
+
+
+def _resolve_password(value: str | None, entropy: bytes) -> str:
+    cleaned = (value or "").strip()
+    if cleaned:
+        return cleaned
+    # Same shape as secrets.token_urlsafe(12), but fed from the run's shared
+    # entropy pool instead of a fresh urandom read.
+    return base64.urlsafe_b64encode(entropy).rstrip(b"=").decode("ascii")
+
+
+def _build_user_blueprints(config: SeedConfig) -> list[dict]:
+    # The country code and email domain never change inside the loops, so
+    # build those fragments once instead of re-formatting them per account.
+    phone_prefix = config.country_code + " "
+    email_suffix = "@" + config.email_domain
+    blueprints = []
+    for index in range(config.official_count):
+        name = f"Seed Official {index + 1}"
+        blueprints.append(
+            {
+                "name": name,
+                "email": _slugify(name) + email_suffix,
+                "phone": phone_prefix + format(7000000000 + index, "010d"),
+                "userType": "official",
+                "officialRole": OFFICIAL_ROLES[index % len(OFFICIAL_ROLES)],
+            }
+        )
+    for index in range(config.citizen_count):
+        name = f"Seed Citizen {index + 1}"
+        blueprints.append(
+            {
+                "name": name,
+                "email": _slugify(name) + email_suffix,
+                "phone": phone_prefix + format(8000000000 + index, "010d"),
+                "userType": "citizen",
+                "officialRole": None,
+            }
+        )
+    return blueprints
+
+
+# Only the fields UserRef actually carries; keeps password hashes and other
+# profile data out of the wire transfer when re-reading seeded users.
+_USER_REF_PROJECTION = {"_id": 1, "name": 1, "email": 1, "phone": 1, "userType": 1}
+
+
+def _as_user_ref(doc: dict) -> UserRef:
+    return UserRef(
+        user_id=str(doc.get("_id")),
+        name=doc.get("name") or "",
+        email=doc.get("email") or "",
+        phone=doc.get("phone") or "",
+        user_type=doc.get("userType") or "citizen",
+    )
+
+
+def _upsert_seed_users(users_collection, config: SeedConfig, entropy: bytes) -> tuple[list[UserRef], list[UserRef], dict]:
+    official_password = _resolve_password(config.official_password, entropy[:12])
+    citizen_password = _resolve_password(config.citizen_password, entropy[12:24])
+    hashes = _hash_passwords([official_password, citizen_password])
+    official_password_hash = hashes[official_password]
+    citizen_password_hash = hashes[citizen_password]
+
+    from pymongo import UpdateOne
+
+    now = datetime.now(timezone.utc)
+    blueprints = _build_user_blueprints(config)
+    operations = []
+    for blueprint in blueprints:
+        is_official = blueprint["userType"] == "official"
+        operations.append(
+            UpdateOne(
+                {"email": blueprint["email"]},
+                {
+                    "$set": {
+                        "name": blueprint["name"],
+                        "phone": blueprint["phone"],
+                        "userType": blueprint["userType"],
+                        "officialRole": blueprint["officialRole"],
+                        "password": official_password_hash if is_official else citizen_password_hash,
+                        "seedTag": SEED_TAG,
+                        "updatedAt": _iso_utc(now),
+                    },
+                    "$setOnInsert": {"createdAt": _iso_utc(now)},
+                },
+                upsert=True,
+            )
+        )
+    # Everything except the _id is already known from the blueprints, so a
+    # full re-read is unnecessary: bulk_write hands back the ids of fresh
+    # inserts, and only pre-existing accounts need a (projected) $in lookup.
+    id_by_email = {}
+    offset = 0
+    for batch in _chunked(operations):
+        result = users_collection.bulk_write(batch, bypass_document_validation=True)
+        for index, object_id in (result.upserted_ids or {}).items():
+            id_by_email[blueprints[offset + index]["email"]] = object_id
+        offset += len(batch)
+    missing_emails = [b["email"] for b in blueprints if b["email"] not in id_by_email]
+    if missing_emails:
+        for doc in users_collection.find({"email": {"$in": missing_emails}}, {"_id": 1, "email": 1}):
+            id_by_email[doc["email"]] = doc["_id"]
+
+    officials = []
+    citizens = []
+    for blueprint in blueprints:
+        object_id = id_by_email.get(blueprint["email"])
+        if object_id is None:
+            continue
+        ref = UserRef(
+            user_id=str(object_id),
+            name=blueprint["name"],
+            email=blueprint["email"],
+            phone=blueprint["phone"],
+            user_type=blueprint["userType"],
+        )
+        if ref.user_type == "official":
+            officials.append(ref)
+        else:
+            citizens.append(ref)
+    passwords = {"official": official_password, "citizen": citizen_password}
+    return officials, citizens, passwords
+
+
+def _fetch_existing_user_pool(users_collection) -> tuple[list[UserRef], list[UserRef]]:
+    # Stream the cursor in fixed batches rather than materializing every raw
+    # document; only the slim UserRef objects are kept.
+    cursor = users_collection.find({}, _USER_REF_PROJECTION).batch_size(_BULK_WRITE_BATCH_SIZE)
+    officials: list[UserRef] = []
+    citizens: list[UserRef] = []
+    all_refs: list[UserRef] = []
+    for doc in cursor:
+        ref = _as_user_ref(doc)
+        all_refs.append(ref)
+        if ref.user_type == "official":
+            officials.append(ref)
+        elif ref.user_type == "citizen":
+            citizens.append(ref)
+    if not citizens:
+        citizens = all_refs
+    return officials, citizens
+
+
+def _build_incident_docs(
+    config: SeedConfig,
+    generator: np.random.Generator,
+    officials: list[UserRef],
+    citizens: list[UserRef],
+    now: datetime,
+) -> list[dict]:
+    import numpy as np
+
+    count = max(0, min(config.incident_count, MAX_INCIDENT_COUNT))
+    # Normalize to UTC once; the loop then only does timedelta arithmetic and
+    # strftime instead of an astimezone/replace/isoformat chain per document.
+    base = now.astimezone(timezone.utc).replace(microsecond=0)
+    # Draw every random value for the run up front as vectors; per-document
+    # work then indexes into the arrays instead of calling the RNG ~6 times
+    # per incident. Bounds mirror the old inclusive randint ranges.
+    statuses = ("open", "pending", "in_progress", "resolved")
+    status_picks = generator.integers(0, len(statuses), size=count)
+    hours_created = generator.integers(2, 505, size=count)
+    hours_resolved = generator.integers(3, 97, size=count)
+    hours_in_progress = generator.integers(1, 37, size=count)
+    lat_jitter = generator.uniform(-0.005, 0.005, size=count)
+    lon_jitter = generator.uniform(-0.005, 0.005, size=count)
+    assignment_draws = generator.random(count)
+    # Template coordinates as arrays so jitter is applied in one vectorized
+    # add; np.resize tiles them in the same index % len order as the loop.
+    template_lat = np.array([template["latitude"] for template in INCIDENT_TEMPLATES])
+    template_lon = np.array([template["longitude"] for template in INCIDENT_TEMPLATES])
+    latitudes = np.resize(template_lat, count) + lat_jitter
+    longitudes = np.resize(template_lon, count) + lon_jitter
+    template_count = len(INCIDENT_TEMPLATES)
+    citizen_count = len(citizens)
+    official_count = len(officials)
+    docs = []
+    for index in range(count):
+        template = INCIDENT_TEMPLATES[index % template_count]
+        created_at = base - timedelta(hours=int(hours_created[index]))
+        status = statuses[status_picks[index]]
+        if status == "resolved":
+            updated_at = created_at + timedelta(hours=int(hours_resolved[index]))
+        elif status == "in_progress":
+            updated_at = created_at + timedelta(hours=int(hours_in_progress[index]))
+        else:
+            updated_at = created_at
+        reporter = citizens[index % citizen_count] if citizens else None
+        assignee = None
+        if officials and assignment_draws[index] < 0.7:
+            assignee = officials[index % official_count]
+        docs.append(
+            {
+                "seedTag": SEED_TAG,
+                "seedKey": f"{SEED_TAG}-incident-{index}",
+                "title": template["title"],
+                "description": template["description"],
+                "category": template["category"],
+                "priority": template["priority"],
+                "status": status,
+                "location": template["location"],
+                "latitude": float(latitudes[index]),
+                "longitude": float(longitudes[index]),
+                "reportedBy": reporter.name if reporter else "Seed Citizen",
+                "reporterId": reporter.user_id if reporter else None,
+                "reporterEmail": reporter.email if reporter else None,
+                "reporterPhone": reporter.phone if reporter else None,
+                "assignedTo": assignee.name if assignee else None,
+                "createdAt": created_at.strftime(_ISO_UTC_FMT),
+                "updatedAt": updated_at.strftime(_ISO_UTC_FMT),
+            }
+        )
+    return docs
+
+
+def _seed_object_id(seed_key: str) -> ObjectId:
+    """Derive a stable ObjectId from a seed key.
+
+    Re-runs recompute the same id, so cross-references stay correct without
+    ever reading the documents back.
+    """
+    from bson import ObjectId
+
+    return ObjectId(hashlib.md5(seed_key.encode("utf-8")).digest()[:12])
+
+
+# Fields a ticket mirrors verbatim from its incident. _build_incident_docs
+# always sets every one of them, so a single itemgetter call replaces a
+# dozen per-key .get() lookups.
+_TICKET_COPY_FIELDS = (
+    "title",
+    "description",
+    "category",
+    "priority",
+    "status",
+    "location",
+    "assignedTo",
+    "reporterEmail",
+    "reporterPhone",
+    "createdAt",
+    "updatedAt",
+)
+_TICKET_COPY_GETTER = itemgetter(*_TICKET_COPY_FIELDS)
+
+
+def _upsert_incidents_and_tickets(
+    incidents_collection, tickets_collection, incident_docs, fresh: bool = False
+) -> tuple[int, int]:
+    if not incident_docs:
+        return 0, 0
+
+    from pymongo import InsertOne, UpdateOne
+
+    # Both ids are generated client-side from the seed keys, so the incident
+    # can embed its ticketId up front and the ticket its incidentId. That
+    # collapses the old upsert/read-back/link dance (3 bulk writes + 2 full
+    # collection reads) into exactly two bulk writes and zero reads.
+    incident_ops = []
+    ticket_ops = []
+    for doc in incident_docs:
+        incident_id = _seed_object_id(doc["seedKey"])
+        ticket_key = f"{doc['seedKey']}-ticket"
+        ticket_id = _seed_object_id(ticket_key)
+        incident = dict(doc)
+        incident["ticketId"] = str(ticket_id)
+        ticket_doc = {
+            "seedTag": SEED_TAG,
+            "seedKey": ticket_key,
+            "incidentId": str(incident_id),
+        }
+        ticket_doc.update(zip(_TICKET_COPY_FIELDS, _TICKET_COPY_GETTER(doc)))
+        if fresh:
+            # The seeded subset was just truncated, so skip the upsert match
+            # phase entirely and let the server do plain inserts.
+            incident_ops.append(InsertOne({"_id": incident_id, **incident}))
+            ticket_ops.append(InsertOne({"_id": ticket_id, **ticket_doc}))
+        else:
+            incident_ops.append(
+                UpdateOne(
+                    {"seedKey": doc["seedKey"]},
+                    {"$set": incident, "$setOnInsert": {"_id": incident_id}},
+                    upsert=True,
+                )
+            )
+            ticket_ops.append(
+                UpdateOne(
+                    {"seedKey": ticket_key},
+                    {"$set": ticket_doc, "$setOnInsert": {"_id": ticket_id}},
+                    upsert=True,
+                )
+            )
+    for batch in _chunked(incident_ops):
+        incidents_collection.bulk_write(batch, bypass_document_validation=True)
+    for batch in _chunked(ticket_ops):
+        tickets_collection.bulk_write(batch, bypass_document_validation=True)
+
+    return len(incident_ops), len(ticket_ops)
+
+
+def _ensure_seed_indexes(db) -> None:
+    """Index the upsert filter keys before writing.
+
+    Without these, every UpdateOne in the bulk writes is a collection scan;
+    with them each match is an index seek, and duplicates are impossible by
+    construction. seedKey indexes are sparse because only seeded documents
+    carry the field.
+    """
+    from pymongo.errors import OperationFailure
+
+    try:
+        db["users"].create_index("email", unique=True)
+        db["incidents"].create_index("seedKey", unique=True, sparse=True)
+        db["tickets"].create_index("seedKey", unique=True, sparse=True)
+        db["incidents"].create_index("seedTag", sparse=True)
+    except OperationFailure as error:
+        print(f"Seed index creation skipped: {error}")
+
+
+@lru_cache(maxsize=1)
+def _get_client(mongo_url: str):
+    """One MongoClient per process, closed at interpreter exit.
+
+    Repeated seed_database calls (multiple configs, driver scripts looping)
+    reuse the connection pool instead of paying the handshake per run.
+    """
+    from pymongo import MongoClient
+
+    # Seed data is disposable: a w=1 acknowledgment is enough, no need to
+    # wait on journaling or replication for fixture writes.
+    client = MongoClient(mongo_url, w=1)
+    atexit.register(client.close)
+    return client
+
+
+def seed_database(config: SeedConfig) -> SeedResult:
+    import numpy as np
+
+    client = _get_client(config.mongo_url)
+    db = client[config.db_name]
+    users_collection = db["users"]
+    incidents_collection = db["incidents"]
+    tickets_collection = db["tickets"]
+
+    _ensure_seed_indexes(db)
+
+    # One urandom read supplies all the run's secret material: a 12-byte
+    # slice per generated password plus the RNG seed, instead of a
+    # separate secrets call (and kernel round trip) for each.
+    entropy = os.urandom(32)
+    if config.random_seed is not None:
+        seed = config.random_seed
+    else:
+        seed = int.from_bytes(entropy[24:28], "big") & 0x7FFFFFFF
+    generator = np.random.default_rng(seed)
+    now = datetime.now(timezone.utc)
+
+    if config.reset_incidents:
+        incidents_collection.delete_many({"seedTag": SEED_TAG})
+        tickets_collection.delete_many({"seedTag": SEED_TAG})
+
+    officials, citizens, passwords = _upsert_seed_users(users_collection, config, entropy)
+    if not officials and not citizens:
+        officials, citizens = _fetch_existing_user_pool(users_collection)
+
+    incident_docs = _build_incident_docs(config, generator, officials, citizens, now)
+    seeded_incidents, seeded_tickets = _upsert_incidents_and_tickets(
+        incidents_collection, tickets_collection, incident_docs, fresh=config.reset_incidents
+    )
+
+    return SeedResult(
+        seeded_users=len(officials) + len(citizens),
+        seeded_incidents=seeded_incidents,
+        seeded_tickets=seeded_tickets,
+        # The totals are informational; estimated_document_count reads the
+        # collection metadata instead of running three full count scans.
+        users_total=users_collection.estimated_document_count(),
+        incidents_total=incidents_collection.estimated_document_count(),
+        tickets_total=tickets_collection.estimated_document_count(),
+        generated_passwords=passwords,
+    )
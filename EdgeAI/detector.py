@@ -5,10 +5,24 @@ from ultralytics import YOLO
 
 LOGGER = logging.getLogger(__name__)
 
-MODEL_PATH = os.getenv("YOLO_MODEL_PATH", "models/best.pt")
 YOLO_DEVICE = os.getenv("YOLO_DEVICE", "auto").strip().lower()
 
 
+def _resolve_model_path() -> str:
+    override = os.getenv("YOLO_MODEL_PATH", "").strip()
+    if override:
+        return override
+    # Prefer an exported runtime build (see export_model.py) over the raw
+    # PyTorch checkpoint when one exists next to it.
+    for candidate in ("models/best.engine", "models/best.onnx"):
+        if os.path.exists(candidate):
+            return candidate
+    return "models/best.pt"
+
+
+MODEL_PATH = _resolve_model_path()
+
+
 def _resolve_yolo_device() -> str:
     if YOLO_DEVICE != "auto":
         return YOLO_DEVICE
@@ -23,6 +37,17 @@ def _resolve_yolo_device() -> str:
 
 
 DETECTION_DEVICE = _resolve_yolo_device()
+
+if DETECTION_DEVICE == "cpu":
+    # Pin the intra-op thread count; defaults tend to oversubscribe small
+    # edge CPUs when other components share the cores.
+    try:
+        import torch  # type: ignore
+
+        torch.set_num_threads(int(os.getenv("YOLO_CPU_THREADS", str(os.cpu_count() or 1))))
+    except Exception as exc:
+        LOGGER.debug("Could not pin CPU thread count: %s", exc)
+
 model = YOLO(MODEL_PATH)
 try:
     model.to(DETECTION_DEVICE)
@@ -30,11 +55,33 @@ except Exception as exc:
     LOGGER.warning("Could not move YOLO model to %s: %s", DETECTION_DEVICE, exc)
 
 
-def detect_issue(frame):
-    results = model(frame, device=DETECTION_DEVICE, verbose=False)
+USE_HALF = DETECTION_DEVICE.startswith("cuda")
 
-    for r in results:
-        if len(r.boxes) > 0:
-            return True, "Garbage Overflow Detected"
+try:
+    import numpy as np
+
+    # Dummy pass so the first real frame doesn't pay warmup/compile cost.
+    model(np.zeros((640, 640, 3), dtype=np.uint8), device=DETECTION_DEVICE, verbose=False)
+except Exception as exc:
+    LOGGER.debug("YOLO warmup pass skipped: %s", exc)
+
+
+def detect_issues(frames):
+    """Run one batched YOLO pass over several frames.
 
-    return False, "No Issue"
+    Batching amortizes model dispatch and NMS across the frames instead of
+    paying the per-call overhead once per frame.
+    """
+    if not frames:
+        return []
+
+    results = model(frames, device=DETECTION_DEVICE, verbose=False, half=USE_HALF)
+
+    return [
+        (True, "Garbage Overflow Detected") if len(r.boxes) > 0 else (False, "No Issue")
+        for r in results
+    ]
+
+
+def detect_issue(frame):
+    return detect_issues([frame])[0]
@@ -0,0 +1,36 @@
+"""One-time export of best.pt to a faster inference runtime.
+
+Run this on the target device so the exported model matches its hardware:
+
+    python export_model.py
+
+On a CUDA device it builds models/best.engine (TensorRT, FP16); otherwise
+it builds models/best.onnx. detector.py picks up the exported file
+automatically on the next start.
+"""
+import os
+
+from ultralytics import YOLO
+
+MODEL_PATH = os.getenv("YOLO_MODEL_PATH", "models/best.pt")
+
+
+def main():
+    model = YOLO(MODEL_PATH)
+
+    use_cuda = False
+    try:
+        import torch
+
+        use_cuda = torch.cuda.is_available()
+    except Exception:
+        pass
+
+    if use_cuda:
+        model.export(format="engine", half=True)
+    else:
+        model.export(format="onnx", simplify=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,70 @@
+import logging
 import os
+import queue
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import cv2
-import base64
+try:
+    import pybase64 as base64  # SIMD base64 when available
+except ImportError:
+    import base64
+
+LOGGER = logging.getLogger(__name__)
 
 SERVER_URL = os.getenv("SERVER_URL", "https://safelive.in/api/report")
 DEVICE_ID = os.getenv("DEVICE_ID", "raspberry-pi-5")
 SCOPE = os.getenv("SCOPE", "campus")
 SOURCE = os.getenv("SOURCE", "edge")
+JPEG_QUALITY = int(os.getenv("JPEG_QUALITY", "80"))
+
+_ENCODE_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+
+# Keep-alive session: reuses the TCP/TLS connection across alerts instead of
+# paying a fresh handshake per POST.
+SESSION = requests.Session()
+_ADAPTER = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.5),
+)
+SESSION.mount("http://", _ADAPTER)
+SESSION.mount("https://", _ADAPTER)
+
+# Uploads drain on a background thread so a slow POST never stalls the
+# capture/detect loop. On overflow the oldest queued alert is dropped.
+_QUEUE = queue.Queue(maxsize=32)
+
+# Failure logging is throttled so a dead backend doesn't flood the journal
+# at one line per capture interval.
+_LOG_EVERY_SECONDS = 30
+_last_warning_at = 0.0
+
+def _warn_throttled(message, *args):
+    global _last_warning_at
+    now = time.monotonic()
+    if now - _last_warning_at >= _LOG_EVERY_SECONDS:
+        _last_warning_at = now
+        LOGGER.warning(message, *args)
+
+def _upload_worker():
+    while True:
+        payload = _QUEUE.get()
+        try:
+            SESSION.post(SERVER_URL, json=payload, timeout=20)
+        except Exception as exc:
+            _warn_throttled("Issue upload to %s failed: %s", SERVER_URL, exc)
+        finally:
+            _QUEUE.task_done()
+
+threading.Thread(target=_upload_worker, daemon=True).start()
 
 def send_issue(frame, description, lat, lon):
 
-    _, buffer = cv2.imencode(".jpg", frame)
-    img_base64 = base64.b64encode(buffer).decode()
+    _, buffer = cv2.imencode(".jpg", frame, _ENCODE_PARAMS)
+    img_base64 = base64.b64encode(buffer).decode("ascii")
 
     payload = {
         "description": description,
@@ -24,4 +77,15 @@ def send_issue(frame, description, lat, lon):
         "source": SOURCE
     }
 
-    requests.post(SERVER_URL, json=payload, timeout=20)
+    try:
+        _QUEUE.put_nowait(payload)
+    except queue.Full:
+        _warn_throttled("Upload queue full, dropping oldest queued alert")
+        try:
+            _QUEUE.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            _QUEUE.put_nowait(payload)
+        except queue.Full:
+            pass